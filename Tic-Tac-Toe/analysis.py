@@ -0,0 +1,150 @@
+import math
+from collections import namedtuple
+
+from bitboard import FULL_MASK, IS_WIN, default_win_length, geometry, iter_bits
+from search import WIN, DeepeningSearch
+from state import GameState
+from tablebase import get_tablebase
+from transposition import canonical
+
+# Values of every legal move in a position, for hints and position files.
+# outcome is 1, 0 or -1 for the side making the move, or None when a search ran
+# out of time before settling it; plies counts to the end of the game with this
+# move included. exact is False for values from a time-limited search.
+MoveValue = namedtuple("MoveValue", ["row", "col", "outcome", "plies", "exact"])
+RESULT_NAMES = {1: "win", 0: "draw", -1: "loss", None: None}
+EMPTY_MARKS = ".-_"
+_solved = {}  # Canonical 3x3 (mine, theirs) key -> (outcome, plies) for the side to move
+
+
+def solve_classic(mine, theirs):
+    # Perfect-play value of a 3x3 position for the side owning mine; fast wins, slow losses
+    key = canonical(mine, theirs)[0]
+    value = _solved.get(key)
+    if value is None:
+        best = None
+        for _, outcome, plies in classic_move_values(mine, theirs):
+            rank = (outcome, -plies if outcome >= 0 else plies)
+            if best is None or rank > best[0]:
+                best = rank, (outcome, plies)
+        value = _solved[key] = best[1]
+    return value
+
+
+def classic_move_values(mine, theirs):
+    # (cell, outcome, plies) per empty cell; siblings share the solved subtrees in _solved
+    values = []
+    for cell in iter_bits(FULL_MASK & ~(mine | theirs)):
+        after = mine | (1 << cell)
+        if IS_WIN[after]:
+            values.append((cell, 1, 1))
+        elif after | theirs == FULL_MASK:
+            values.append((cell, 0, 1))
+        else:
+            outcome, plies = solve_classic(theirs, after)
+            values.append((cell, -outcome, plies + 1))
+    return values
+
+
+def analyze(state, time_budget_ms=100, use_tablebase=True, stats=None, exact_only=False):
+    # MoveValue for every legal move of the side to move, in cell order; empty once the
+    # game is over. With exact_only, None instead of searching when nothing solves the board
+    if not isinstance(state, GameState):
+        raise ValueError("Move analysis covers square and cube boards only")
+    if state.is_over():
+        return []
+    geo = state.geometry
+    player = state.to_move
+    mine = state.bits(player)
+    theirs = state.bits("O" if player == "X" else "X")
+    coords = state.cell_coords
+    if geo.is_classic():
+        return [MoveValue(*coords(cell), outcome, plies, True) for cell, outcome, plies in classic_move_values(mine, theirs)]
+    tablebase = get_tablebase(geo) if use_tablebase else None
+    if tablebase is not None:
+        # None when to_move does not match the stone counts, which the table never stores
+        values = tablebase.move_values(mine, theirs, player == "X")
+        if values is not None:
+            return [MoveValue(*coords(cell), outcome, plies, True) for cell, outcome, plies in values]
+    if exact_only:
+        return None
+    search = DeepeningSearch(geo, time_budget_ms, stats=stats)
+    scores, depth = search.score_moves(mine, theirs)
+    empty = state.empty_mask()
+    # Every line of a search that reached the last empty cell ends the game
+    to_the_end = depth >= bin(empty).count("1")
+    values = []
+    for cell in iter_bits(empty):
+        score = scores.get(cell)
+        outcome = plies = None
+        if score is None:
+            pass
+        elif score > WIN // 2:
+            outcome, plies = 1, WIN - score
+        elif score < -WIN // 2:
+            outcome, plies = -1, WIN + score
+        elif to_the_end:
+            outcome, plies = 0, bin(empty).count("1")
+        values.append(MoveValue(*coords(cell), outcome, plies, False))
+    return values
+
+
+def parse_position(text):
+    # "XO./.X./..O" or "XO..X...O", X/O for marks and . - _ for empty cells, rows
+    # optionally split by "/", then an optional win length: "..../..../..../.... 3"
+    fields = text.split()
+    if not fields or len(fields) > 2:
+        raise ValueError("Expected a board and an optional win length")
+    cells = fields[0].replace("/", "")
+    size = math.isqrt(len(cells))
+    if size * size != len(cells):
+        raise ValueError(f"{len(cells)} cells do not make a square board")
+    try:
+        win_length = int(fields[1]) if len(fields) > 1 else default_win_length(size)
+    except ValueError:
+        raise ValueError(f"Win length {fields[1]!r} is not a number") from None
+    geo = geometry(size, win_length)
+    x = o = 0
+    for i, mark in enumerate(cells):
+        if mark in "Xx":
+            x |= 1 << i
+        elif mark in "Oo":
+            o |= 1 << i
+        elif mark not in EMPTY_MARKS:
+            raise ValueError(f"Unknown mark {mark!r}")
+    if not 0 <= bin(x).count("1") - bin(o).count("1") <= 1:
+        raise ValueError("X moves first, so X has as many marks as O or one more")
+    return GameState.from_bits(x, o, geo)
+
+
+def format_position(state):
+    size = state.size
+    rows = ["".join(mark if mark != " " else "." for mark in row) for row in state.rows()]
+    text = "/".join(rows)
+    if state.geometry.win_length != default_win_length(size):
+        text += f" {state.geometry.win_length}"
+    return text
+
+
+def analyze_lines(lines, time_budget_ms=100):
+    # One result dict per position line, as soon as it is analysed; blank lines
+    # and # comments are skipped and a bad line yields an "error" entry
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        try:
+            state = parse_position(line)
+        except ValueError as error:
+            yield {"position": line, "error": str(error)}
+            continue
+        over = state.is_over()
+        yield {
+            "position": format_position(state),
+            "to_move": None if over else state.to_move,
+            "winner": state.winner if state.winner is not None else "draw" if over else None,
+            "moves": [
+                {"row": v.row, "col": v.col, "result": RESULT_NAMES[v.outcome], "plies": v.plies, "exact": v.exact}
+                for v in analyze(state, time_budget_ms)
+            ],
+        }
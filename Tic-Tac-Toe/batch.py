@@ -0,0 +1,65 @@
+from collections import namedtuple
+
+import numpy as np
+
+from bitboard import default_win_length, geometry
+
+# Vectorised, side-effect free position evaluation for many boards at once.
+# Cells are coded 0 = empty, 1 = X, 2 = O; " ", "X" and "O" strings are accepted too.
+EMPTY = 0
+X = 1
+O = 2
+
+# winners: int8 (N,) 0/X/O; winning_lines: int64 (N,) row of line_matrix or -1;
+# draws: bool (N,); legal_moves: bool (N, cells), all False once a game is won
+Evaluation = namedtuple("Evaluation", ["winners", "winning_lines", "draws", "legal_moves"])
+
+_line_matrices = {}
+
+
+def line_matrix(size=3, win_length=None):
+    # (lines, win_length) array of the cell indices in every winning line
+    if win_length is None:
+        win_length = default_win_length(size)
+    key = (size, win_length)
+    if key not in _line_matrices:
+        _line_matrices[key] = np.array(geometry(size, win_length).win_lines, dtype=np.int64)
+    return _line_matrices[key]
+
+
+def as_cells(positions):
+    # Returns an (N, cells) int8 array and the board size
+    cells = np.asarray(positions)
+    if cells.dtype.kind in "US":
+        cells = np.select([cells == "X", cells == "O"], [X, O], EMPTY)
+    if cells.ndim == 3:
+        if cells.shape[1] != cells.shape[2]:
+            raise ValueError("Boards must be square")
+        cells = cells.reshape(len(cells), -1)
+    elif cells.ndim != 2:
+        raise ValueError("Expected an (N, cells) or (N, size, size) array")
+    size = int(round(cells.shape[1] ** 0.5))
+    if size * size != cells.shape[1]:
+        raise ValueError("Boards must be square")
+    return cells.astype(np.int8, copy=False), size
+
+
+def line_hits(cells, lines, player):
+    # (N, lines) bool: which lines are completely filled by player
+    return (cells[:, lines] == player).all(axis=2)
+
+
+def evaluate_positions(positions, win_length=None):
+    cells, size = as_cells(positions)
+    lines = line_matrix(size, win_length)
+    x_lines = line_hits(cells, lines, X)
+    o_lines = line_hits(cells, lines, O)
+    x_won = x_lines.any(axis=1)
+    o_won = o_lines.any(axis=1) & ~x_won
+    finished = x_won | o_won
+    winners = np.where(x_won, X, np.where(o_won, O, EMPTY)).astype(np.int8)
+    winning_lines = np.where(x_won, x_lines.argmax(axis=1), np.where(o_won, o_lines.argmax(axis=1), -1))
+    empty = cells == EMPTY
+    draws = ~finished & ~empty.any(axis=1)
+    legal_moves = empty & ~finished[:, None]
+    return Evaluation(winners, winning_lines, draws, legal_moves)
@@ -0,0 +1,216 @@
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import engine
+from engine import TicTacToe
+
+# Fixed positions as move sequences from the empty board, X first. All are
+# still in play so the side to move has a search to do.
+MIDGAME_POSITIONS = {
+    "corner_opening": [(0, 0)],
+    "center_corner": [(1, 1), (0, 0)],
+    "diagonal": [(0, 0), (1, 1), (2, 2)],
+    "double_threat": [(0, 0), (0, 1), (1, 1), (2, 2), (0, 2)],
+    "edge_play": [(0, 1), (1, 1), (1, 0), (2, 2)],
+}
+BOARD_CALLS = 1000  # Calls per sample for the cheap board methods
+WARM_CALLS = 100  # Calls per sample for cache hits, which are too fast to time singly
+
+
+def position(moves):
+    game = TicTacToe()
+    player = "X"
+    for row, col in moves:
+        game.make_move(row, col, player)
+        player = "O" if player == "X" else "X"
+    game.current_player = player
+    return game
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func, repeat, setup=None, calls=1):
+    # Returns per-call latencies in seconds; setup runs untimed before each sample
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        samples.append((time.perf_counter() - start) / calls)
+    return samples
+
+
+def peak_memory(func, setup=None):
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarise(samples, peak, nodes=None):
+    p50 = percentile(samples, 0.5)
+    result = {
+        "samples": len(samples),
+        "mean_us": sum(samples) / len(samples) * 1e6,
+        "p50_us": p50 * 1e6,
+        "p90_us": percentile(samples, 0.9) * 1e6,
+        "p99_us": percentile(samples, 0.99) * 1e6,
+        "peak_kib": peak / 1024.0,
+    }
+    if nodes is not None:
+        result["nodes"] = nodes
+        result["nodes_per_sec"] = nodes / p50 if p50 else 0.0
+    return result
+
+
+def count_nodes(moves, clear):
+    # Counted in a separate run so instrumentation does not distort latency
+    if clear:
+        TicTacToe.transposition_table.clear()
+    game = position(moves)
+    stats = game.enable_stats()
+    player = game.current_player
+    game.minimax(True, player, "O" if player == "X" else "X")
+    return stats.nodes
+
+
+def bench_board(results, repeat):
+    game = position(MIDGAME_POSITIONS["double_threat"])
+    for name in ("check_winner", "is_draw", "get_available_moves"):
+        method = getattr(game, name)
+        results[name] = summarise(measure(method, repeat, calls=BOARD_CALLS), peak_memory(method))
+
+
+def bench_minimax(results, repeat, name, moves):
+    game = position(moves)
+    player = game.current_player
+    opponent = "O" if player == "X" else "X"
+
+    def run():
+        game.minimax(True, player, opponent)
+
+    clear = TicTacToe.transposition_table.clear
+    results[f"minimax_{name}_cold"] = summarise(
+        measure(run, repeat, setup=clear), peak_memory(run, setup=clear), count_nodes(moves, True)
+    )
+    run()
+    results[f"minimax_{name}_warm"] = summarise(
+        measure(run, repeat, calls=WARM_CALLS), peak_memory(run), count_nodes(moves, False)
+    )
+
+
+def bench_ai_move(results, repeat):
+    game = TicTacToe(ai_player="X", human_player="O")
+
+    def setup():
+        game.reset()
+
+    def run():
+        game.ai_move()
+
+    def warm_run():
+        # Cache hits are timed in a loop; resetting the board is part of each call
+        game.reset()
+        game.ai_move()
+
+    TicTacToe.use_lookup_table = False
+    try:
+        def cold_setup():
+            TicTacToe.transposition_table.clear()
+            setup()
+
+        results["ai_move_search_cold"] = summarise(
+            measure(run, repeat, setup=cold_setup), peak_memory(run, setup=cold_setup)
+        )
+        results["ai_move_search_warm"] = summarise(
+            measure(warm_run, repeat, calls=WARM_CALLS), peak_memory(run, setup=setup)
+        )
+    finally:
+        TicTacToe.use_lookup_table = True
+    if engine._get_perfect_play_table() is not None:
+        results["ai_move_table"] = summarise(
+            measure(warm_run, repeat, calls=WARM_CALLS), peak_memory(run, setup=setup)
+        )
+
+
+def run_all(repeat):
+    results = {}
+    bench_board(results, repeat)
+    bench_minimax(results, max(3, repeat // 10), "empty", [])
+    for name, moves in MIDGAME_POSITIONS.items():
+        bench_minimax(results, repeat, name, moves)
+    bench_ai_move(results, repeat)
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    # Returns the names whose median latency got worse by more than tolerance
+    regressions = []
+    for name, current in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before or not before["p50_us"]:
+            continue
+        ratio = current["p50_us"] / before["p50_us"]
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:34} {before['p50_us']:12.2f} -> {current['p50_us']:12.2f} us  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def print_report(report):
+    print(f"{'benchmark':34} {'p50 us':>12} {'p99 us':>12} {'nodes/s':>12} {'peak KiB':>10}")
+    for name, result in report["results"].items():
+        nps = f"{result['nodes_per_sec']:12.0f}" if "nodes_per_sec" in result else f"{'':12}"
+        print(f"{name:34} {result['p50_us']:12.2f} {result['p99_us']:12.2f} {nps} {result['peak_kib']:10.1f}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Benchmark the board and AI hot paths.")
+    parser.add_argument("--repeat", type=int, default=50, help="samples per benchmark")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed slowdown before flagging, e.g. 0.10")
+    args = parser.parse_args()
+
+    report = run_all(args.repeat)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,146 @@
+import itertools
+
+# Bitboard board: one integer per player, bit index = row * size + col
+
+
+def iter_bits(mask):
+    # Yields set bit indices from lowest to highest
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+# Line directions; in 3D every direction whose first non-zero step is positive
+DIRECTIONS = {
+    2: ((0, 1), (1, 0), (1, 1), (1, -1)),
+    3: tuple(
+        (a, b, c) for a in (0, 1) for b in (-1, 0, 1) for c in (-1, 0, 1)
+        if (a, b, c) > (0, 0, 0)
+    ),
+}
+
+
+def _lines(size, win_length, dimensions=2):
+    lines = []
+    for start in itertools.product(range(size), repeat=dimensions):
+        for step in DIRECTIONS[dimensions]:
+            end = [p + d * (win_length - 1) for p, d in zip(start, step)]
+            if all(0 <= p < size for p in end):
+                lines.append(tuple(
+                    _index([p + d * k for p, d in zip(start, step)], size) for k in range(win_length)
+                ))
+    return tuple(lines)
+
+
+def _index(coords, size):
+    index = 0
+    for p in coords:
+        index = index * size + p
+    return index
+
+
+class Geometry:
+    # Everything about an N x N (or N x N x N), K-in-a-row board that does not
+    # depend on the pieces. A cube is stored as N stacked N x N layers, so bit
+    # row * N + col still works with row = layer * N + row within the layer
+    def __init__(self, size, win_length, dimensions=2):
+        if dimensions == 3:
+            if not 3 <= size <= 4:
+                raise ValueError("Cube size must be 3 or 4")
+        elif dimensions != 2:
+            raise ValueError("Boards are 2D or 3D")
+        elif not 3 <= size <= 8:
+            raise ValueError("Board size must be between 3 and 8")
+        if not 3 <= win_length <= size:
+            raise ValueError("Win length must be between 3 and the board size")
+        self.size = size
+        self.win_length = win_length
+        self.dimensions = dimensions
+        self.cells = size ** dimensions
+        self.rows = self.cells // size  # Rows of every layer together
+        self.full_mask = (1 << self.cells) - 1
+        self.win_lines = _lines(size, win_length, dimensions)
+        self.win_masks = tuple(sum(1 << i for i in line) for line in self.win_lines)
+        # masks_through[i] holds the win masks that contain cell i
+        self.masks_through = tuple(
+            tuple(m for m in self.win_masks if m >> i & 1) for i in range(self.cells)
+        )
+        center = (size - 1) / 2
+        coords = list(itertools.product(range(size), repeat=dimensions))
+        self.move_order = tuple(sorted(
+            range(self.cells),
+            key=lambda i: sum((p - center) ** 2 for p in coords[i]),
+        ))
+        # Per axis: the bit stride and the cells on the low and high faces
+        self.axes = tuple(
+            (
+                size ** (dimensions - 1 - axis),
+                sum(1 << i for i, c in enumerate(coords) if c[axis] == 0),
+                sum(1 << i for i, c in enumerate(coords) if c[axis] == size - 1),
+            )
+            for axis in range(dimensions)
+        )
+
+    def is_classic(self):
+        return self.size == 3 and self.win_length == 3 and self.dimensions == 2
+
+    def has_win(self, bits):
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def wins_through(self, bits, index):
+        # Only lines through the last-played cell can have been completed
+        for mask in self.masks_through[index]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def neighbours(self, bits):
+        # Cells at most one step (including diagonally) from any set bit
+        full = self.full_mask
+        for stride, low, high in self.axes:
+            bits |= ((bits << stride) & full & ~low) | ((bits >> stride) & ~high)
+        return bits
+
+
+_geometries = {}
+
+
+def default_win_length(size):
+    return min(size, 5)
+
+
+def geometry(size=3, win_length=None, dimensions=2):
+    if win_length is None:
+        win_length = size if dimensions == 3 else default_win_length(size)
+    key = (size, win_length, dimensions)
+    if key not in _geometries:
+        _geometries[key] = Geometry(size, win_length, dimensions)
+    return _geometries[key]
+
+
+# The classic 3x3 board, used by the exact solver, the transposition table
+# and the precomputed lookup table
+CLASSIC = geometry(3, 3)
+SIZE = CLASSIC.size
+CELLS = CLASSIC.cells
+FULL_MASK = CLASSIC.full_mask
+WIN_LINES = CLASSIC.win_lines
+WIN_MASKS = CLASSIC.win_masks
+
+# Search order: center, corners, then edges
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# IS_WIN[bits] is True when the 9-bit mask contains a complete line
+IS_WIN = tuple(CLASSIC.has_win(bits) for bits in range(1 << CELLS))
+
+
+def cell_index(row, col):
+    return row * SIZE + col
+
+
+def cell_coords(index):
+    return divmod(index, SIZE)
@@ -0,0 +1,456 @@
+import random
+import time
+
+from bitboard import FULL_MASK, IS_WIN, MOVE_ORDER, cell_coords, geometry
+from lookup_table import load_table
+from state import GameState
+from stats import SearchStats
+from transposition import EXACT, LOWER, UPPER, shared_table
+
+# Game model and AI engines; deliberately free of any UI imports
+
+WIN_SCORE = 10
+DIFFICULTIES = ("Easy", "Unbeatable", "Monte Carlo")
+_perfect_play_table = None
+_perfect_play_table_loaded = False
+
+
+class TicTacToe:
+    # A session: settings plus the current GameState and its undo history.
+    # Positions are immutable, so a copy for an off-thread search shares them
+    __slots__ = (
+        "geometry", "size", "win_length", "time_budget_ms", "difficulty", "mcts_workers", "stats",
+        "stats_callback", "cancel_event", "state", "moves", "redo_moves", "ai_player", "human_player",
+    )
+    transposition_table = shared_table
+    use_lookup_table = True
+
+    def __init__(self, ai_player=None, human_player=None, size=3, win_length=None, time_budget_ms=1000,
+                 difficulty="Unbeatable", mcts_workers=None, dimensions=2):
+        # A 3D board is size stacked layers; row counts down through all of them
+        self.geometry = geometry(size, win_length, dimensions)
+        self.size = size
+        self.win_length = self.geometry.win_length
+        self.time_budget_ms = time_budget_ms  # Per-move limit for searches that cannot finish
+        self.difficulty = difficulty  # One of DIFFICULTIES
+        self.mcts_workers = mcts_workers  # None uses every core
+        self.stats = None  # SearchStats while instrumentation is enabled
+        self.stats_callback = None
+        self.cancel_event = None  # threading.Event that stops a running search early
+        self.state = self.initialize_board()
+        self.moves = []  # Cell indices in play order; undo_move pops from here
+        self.redo_moves = []  # Cells taken back by undo_move, latest last
+        self.ai_player = ai_player  # 'X' or 'O' or None
+        self.human_player = human_player  # 'X' or 'O' or None
+
+    def initialize_board(self):
+        return GameState(geometry=self.geometry)
+
+    @property
+    def board(self):
+        # Read-only view kept for callers of the old mutable board
+        return self.state
+
+    @property
+    def current_player(self):
+        return self.state.to_move
+
+    @current_player.setter
+    def current_player(self, player):
+        self.state = self.state.with_turn(player)
+
+    @property
+    def winning_cells(self):
+        return self.state.winning_cells
+
+    @property
+    def dimensions(self):
+        return self.geometry.dimensions
+
+    def print_board(self):
+        rows = self.state.rows()
+        if self.dimensions == 3:
+            # Layers side by side, each under its number
+            n = self.size
+            width = 4 * n - 3
+            print("    ".join(f"Layer {layer}".ljust(width) for layer in range(n)))
+            for r in range(n):
+                print("    ".join(" | ".join(rows[layer * n + r]) for layer in range(n)))
+                if r < n - 1:
+                    print("    ".join("-" * width for _ in range(n)))
+            return
+        for row in rows:
+            print(" | ".join(row))
+            print("-" * (4 * self.size - 3))
+
+    def copy(self):
+        # Same settings and position with its own search state, for searching off-thread
+        clone = TicTacToe(self.ai_player, self.human_player, self.size, self.win_length,
+                          self.time_budget_ms, self.difficulty, self.mcts_workers, self.dimensions)
+        clone.state = self.state
+        clone.moves = list(self.moves)
+        return clone
+
+    def enable_stats(self, callback=None):
+        # callback(stats) is called after every AI move
+        self.stats = SearchStats()
+        self.stats_callback = callback
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+        self.stats_callback = None
+
+    def get_cell(self, row, col):
+        return self.state.get(row, col)
+
+    def is_valid_move(self, row, col):
+        return self.state.is_empty(row, col)
+
+    def make_move(self, row, col, player):
+        # The turn passes to the other player
+        self.redo_moves.clear()
+        cell = self.state.cell_index(row, col)
+        self.state = self.state.apply(cell, player)
+        self.moves.append(cell)
+
+    def undo_move(self):
+        # Takes back the last move and gives that player the turn again; returns its (row, col) or None
+        if not self.moves:
+            return None
+        cell = self.moves.pop()
+        self.state = self.state.without(cell)
+        self.redo_moves.append(cell)
+        return self.state.cell_coords(cell)
+
+    def redo_move(self):
+        # Replays the last undone move; returns its (row, col) or None
+        if not self.redo_moves:
+            return None
+        cell = self.redo_moves.pop()
+        self.state = self.state.apply(cell)
+        self.moves.append(cell)
+        return self.state.cell_coords(cell)
+
+    def set_position(self, x, o, to_move=None):
+        # Replaces the position without a move history
+        self.state = GameState.from_bits(x, o, self.geometry, to_move)
+        self.moves = []
+        self.redo_moves = []
+
+    def check_winner(self):
+        return self.state.winner
+
+    def is_draw(self):
+        return self.state.is_full()
+
+    def reset(self):
+        self.state = self.initialize_board()
+        self.moves = []
+        self.redo_moves = []
+
+    def get_available_moves(self):
+        return self.state.available_moves()
+
+    def minimax(self, is_maximizing, player, opponent):
+        # Exact solver for the 3x3 board. Scores are WIN_SCORE minus the number of
+        # plies to the result, so faster wins and slower losses are preferred
+        if not self.geometry.is_classic():
+            raise ValueError("minimax only solves the 3x3 board; use search_move")
+        score, move = self._minimax(
+            is_maximizing, self.state.bits(player), self.state.bits(opponent),
+            0, -WIN_SCORE - 1, WIN_SCORE + 1,
+        )
+        return score, cell_coords(move) if move is not None else None
+
+    def _minimax(self, is_maximizing, mine, theirs, depth, alpha, beta):
+        # Works on raw bitmasks so no board object is touched during search
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+            if depth > stats.max_depth:
+                stats.max_depth = depth
+        if IS_WIN[mine]:
+            return WIN_SCORE - depth, None
+        elif IS_WIN[theirs]:
+            return depth - WIN_SCORE, None
+        empty = FULL_MASK & ~(mine | theirs)
+        if not empty:
+            return 0, None
+
+        alpha_orig, beta_orig = alpha, beta
+        cached = self.transposition_table.lookup(mine, theirs, is_maximizing)
+        if stats is not None:
+            if cached is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        if cached is not None:
+            score, move, flag = cached
+            score = _score_from_table(score, depth)
+            if flag == EXACT:
+                return score, move
+            elif flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score, move
+
+        best_move = None
+        if is_maximizing:
+            best_score = -WIN_SCORE - 1
+            for i in _ordered_moves(empty, mine, theirs):
+                score, _ = self._minimax(False, mine | (1 << i), theirs, depth + 1, alpha, beta)
+                if score > best_score:
+                    best_score = score
+                    best_move = i
+                    if score > alpha:
+                        alpha = score
+                        if alpha >= beta:
+                            break
+        else:
+            best_score = WIN_SCORE + 1
+            for i in _ordered_moves(empty, theirs, mine):
+                score, _ = self._minimax(True, mine, theirs | (1 << i), depth + 1, alpha, beta)
+                if score < best_score:
+                    best_score = score
+                    best_move = i
+                    if score < beta:
+                        beta = score
+                        if alpha >= beta:
+                            break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transposition_table.store(
+            mine, theirs, is_maximizing, _score_to_table(best_score, depth), best_move, flag
+        )
+        return best_score, best_move
+
+    def lookup_move(self, player):
+        # Answers from the precomputed table when it exists and player is to move
+        if not self.use_lookup_table or not self.geometry.is_classic():
+            return None
+        table = _get_perfect_play_table()
+        if table is None:
+            return None
+        x, o = self.state.x, self.state.o
+        x_to_move = bin(x).count("1") == bin(o).count("1")
+        if x_to_move != (player == "X"):
+            return None
+        entry = table.lookup(x, o)
+        if entry is None:
+            return None
+        return cell_coords(entry[0])
+
+    def tablebase_move(self, player):
+        # Answers from a solved tablebase for this board, if one has been built
+        if not self.use_lookup_table:
+            return None
+        from tablebase import get_tablebase
+
+        tablebase = get_tablebase(self.geometry)
+        if tablebase is None:
+            return None
+        x, o = self.state.x, self.state.o
+        x_to_move = bin(x).count("1") == bin(o).count("1")
+        if x_to_move != (player == "X"):
+            return None
+        opponent = "O" if player == "X" else "X"
+        found = tablebase.best_move(self.state.bits(player), self.state.bits(opponent), x_to_move)
+        if found is None:
+            return None
+        return self.state.cell_coords(found[0])
+
+    def search_move(self, player):
+        # Best move found by iterative deepening within time_budget_ms; 3D boards
+        # add threat-space search for forcing sequences
+        if self.dimensions == 3:
+            from qubic import QubicSearch as search_class
+        else:
+            from search import DeepeningSearch as search_class
+
+        opponent = "O" if player == "X" else "X"
+        search = search_class(self.geometry, self.time_budget_ms, stats=self.stats, cancel_event=self.cancel_event)
+        _, move = search.search(self.state.bits(player), self.state.bits(opponent))
+        return self.state.cell_coords(move) if move is not None else None
+
+    def analyze(self, time_budget_ms=None, exact_only=False):
+        # Value of every legal move for the side to move, from one shared search; see analysis.py
+        from analysis import analyze
+
+        if time_budget_ms is None:
+            time_budget_ms = self.time_budget_ms
+        return analyze(self.state, time_budget_ms, self.use_lookup_table, self.stats, exact_only)
+
+    def choose_move(self, player):
+        stats = self.stats
+        if stats is None:
+            return self._choose_move(player)
+        stats.reset()
+        start = time.perf_counter()
+        move = self._choose_move(player)
+        stats.wall_time = time.perf_counter() - start
+        stats.move = move
+        if self.stats_callback is not None:
+            self.stats_callback(stats)
+        return move
+
+    def _choose_move(self, player):
+        stats = self.stats
+        if self.difficulty == "Easy":
+            if stats is not None:
+                stats.engine = "random"
+            moves = self.get_available_moves()
+            return random.choice(moves) if moves else None
+        if self.difficulty == "Monte Carlo":
+            if stats is not None:
+                stats.engine = "mcts"
+            from mcts import mcts_move
+
+            opponent = "O" if player == "X" else "X"
+            move = mcts_move(
+                self.geometry, self.state.bits(player), self.state.bits(opponent),
+                time_budget_ms=self.time_budget_ms, workers=self.mcts_workers, stats=stats,
+                cancel_event=self.cancel_event,
+            )
+            return self.state.cell_coords(move) if move is not None else None
+        if self.geometry.is_classic():
+            move = self.lookup_move(player)
+            if move is not None:
+                if stats is not None:
+                    stats.engine = "table"
+                return move
+            if stats is not None:
+                stats.engine = "minimax"
+            _, move = self.minimax(True, player, "O" if player == "X" else "X")
+            return move
+        move = self.tablebase_move(player)
+        if move is not None:
+            if stats is not None:
+                stats.engine = "tablebase"
+            return move
+        if stats is not None:
+            stats.engine = "threat-space" if self.dimensions == 3 else "deepening"
+        return self.search_move(player)
+
+    def ai_move(self):
+        if self.ai_player:
+            move = self.choose_move(self.ai_player)
+            if move:
+                row, col = move
+                self.make_move(row, col, self.ai_player)
+                return row, col
+        return None, None
+
+
+class UltimateTicTacToe(TicTacToe):
+    # Ultimate Tic-Tac-Toe on the same session API: rows and columns run 0-8
+    # across the whole 9x9 grid, and state is an UltimateState
+    __slots__ = ()
+
+    def __init__(self, ai_player=None, human_player=None, time_budget_ms=1000, difficulty="Unbeatable"):
+        super().__init__(ai_player, human_player, 3, 3, time_budget_ms, difficulty)
+        self.size = 9  # geometry stays the 3x3 geometry of one small board
+
+    def initialize_board(self):
+        # ultimate builds its move and hash tables on import, so only Ultimate games pay for them
+        from ultimate import UltimateState
+
+        return UltimateState()
+
+    def print_board(self):
+        rows = self.state.rows()
+        for r, row in enumerate(rows):
+            if r and not r % 3:
+                print("=" * 35)
+            print(" || ".join(" | ".join(row[c:c + 3]) for c in (0, 3, 6)))
+        active = self.state.active
+        if not self.state.is_over():
+            print("Play in any open board" if active < 0 else
+                  f"Play in the board at rows {active // 3 * 3}-{active // 3 * 3 + 2}, "
+                  f"cols {active % 3 * 3}-{active % 3 * 3 + 2}")
+
+    def copy(self):
+        clone = UltimateTicTacToe(self.ai_player, self.human_player, self.time_budget_ms, self.difficulty)
+        clone.state = self.state
+        clone.moves = list(self.moves)
+        return clone
+
+    def is_valid_move(self, row, col):
+        return self.state.is_legal(self.state.cell_index(row, col))
+
+    def set_position(self, x, o, to_move=None):
+        raise ValueError("Ultimate positions depend on the move order; replay the moves instead")
+
+    def minimax(self, is_maximizing, player, opponent):
+        raise ValueError("minimax only solves the 3x3 board; use search_move")
+
+    def search_move(self, player):
+        if player != self.state.to_move:
+            return None
+        from ultimate import UltimateSearch
+
+        search = UltimateSearch(self.time_budget_ms, stats=self.stats, cancel_event=self.cancel_event)
+        _, move = search.search(self.state)
+        return self.state.cell_coords(move) if move is not None else None
+
+    def _choose_move(self, player):
+        stats = self.stats
+        if self.difficulty == "Easy":
+            if stats is not None:
+                stats.engine = "random"
+            moves = self.get_available_moves()
+            return random.choice(moves) if moves else None
+        if stats is not None:
+            stats.engine = "ultimate"
+        return self.search_move(player)
+
+
+def _get_perfect_play_table():
+    # Loaded once per process; the mmap'd pages are shared between processes
+    global _perfect_play_table, _perfect_play_table_loaded
+    if not _perfect_play_table_loaded:
+        _perfect_play_table = load_table(WIN_SCORE)
+        _perfect_play_table_loaded = True
+    return _perfect_play_table
+
+
+def _ordered_moves(empty, mover, other):
+    # Winning moves first, then blocks, then center/corners/edges
+    wins = []
+    blocks = []
+    rest = []
+    for i in MOVE_ORDER:
+        bit = 1 << i
+        if not empty & bit:
+            continue
+        if IS_WIN[mover | bit]:
+            wins.append(i)
+        elif IS_WIN[other | bit]:
+            blocks.append(i)
+        else:
+            rest.append(i)
+    return wins + blocks + rest
+
+
+def _score_to_table(score, depth):
+    # Table scores count plies from the stored position, not from the search root
+    if score > 0:
+        return score + depth
+    if score < 0:
+        return score - depth
+    return score
+
+
+def _score_from_table(score, depth):
+    if score > 0:
+        return score - depth
+    if score < 0:
+        return score + depth
+    return score
@@ -0,0 +1,207 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+# Fixed-width binary game records. A file is a header followed by records of
+# record_size bytes each, so record n starts at HEADER.size + n * record_size.
+# Each record is RECORD.size bytes of fields and then max_moves bytes of moves,
+# one cell index per move in play order (unused bytes are zero).
+MAGIC = b"TTTG"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHH6x")  # magic, version, max_moves, record size
+RECORD = struct.Struct("<dBBBBBB2x")  # time, size, win_length, move count, result, difficulty, players
+MAX_MOVES = 64  # Room for the largest (8x8) board
+RESULTS = {None: 0, "X": 1, "O": 2}
+RESULT_NAMES = {code: name for name, code in RESULTS.items()}
+# Fixed codes rather than positions in engine.DIFFICULTIES, so files outlive a reordering
+DIFFICULTIES = {"Easy": 0, "Unbeatable": 1, "Monte Carlo": 2}
+DIFFICULTY_NAMES = {code: name for name, code in DIFFICULTIES.items()}
+NO_DIFFICULTY = 255
+X_IS_AI = 1
+O_IS_AI = 2
+CUBE = 4  # Played on a size x size x size cube; moves index its stacked layers
+RECORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.bin")
+
+# winner is "X", "O" or None for a draw; x_player and o_player are "human" or "ai"
+GameRecord = namedtuple(
+    "GameRecord",
+    ["time", "size", "win_length", "winner", "difficulty", "x_player", "o_player", "moves", "dimensions"],
+    defaults=(2,),
+)
+
+
+def record_from_game(game, timestamp=None):
+    # Difficulty is only recorded for games with an AI in them
+    players = (X_IS_AI if game.ai_player == "X" else 0) | (O_IS_AI if game.ai_player == "O" else 0)
+    return GameRecord(
+        time.time() if timestamp is None else timestamp, game.size, game.win_length, game.check_winner(),
+        game.difficulty if game.ai_player else None,
+        "ai" if players & X_IS_AI else "human", "ai" if players & O_IS_AI else "human",
+        tuple(game.moves), game.dimensions,
+    )
+
+
+class GameRecordWriter:
+    def __init__(self, path=RECORDS_PATH, max_moves=MAX_MOVES):
+        # Appends to an existing file, which keeps its own max_moves
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with open(path, "rb") as f:
+                max_moves = _check_header(f.read(HEADER.size))
+            self.file = open(path, "ab")
+            # Drop a record cut short by a crash so the rest stay aligned
+            extra = (os.path.getsize(path) - HEADER.size) % (RECORD.size + max_moves)
+            if extra:
+                self.file.truncate(os.path.getsize(path) - extra)
+        else:
+            self.file = open(path, "wb")
+            self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, max_moves, RECORD.size + max_moves))
+        self.max_moves = max_moves
+        self._moves = struct.Struct(f"{max_moves}s")
+
+    def write(self, record):
+        if len(record.moves) > self.max_moves:
+            raise ValueError(f"Game has {len(record.moves)} moves; this file holds at most {self.max_moves}")
+        players = (X_IS_AI if record.x_player == "ai" else 0) | (O_IS_AI if record.o_player == "ai" else 0)
+        if record.dimensions == 3:
+            players |= CUBE
+        difficulty = DIFFICULTIES[record.difficulty] if record.difficulty else NO_DIFFICULTY
+        self.file.write(RECORD.pack(
+            record.time, record.size, record.win_length, len(record.moves), RESULTS[record.winner],
+            difficulty, players,
+        ))
+        self.file.write(self._moves.pack(bytes(record.moves)))
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameRecordReader:
+    def __init__(self, path=RECORDS_PATH):
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{path} is empty")
+        self.max_moves = _check_header(self.data[:HEADER.size])
+        self.record_size = RECORD.size + self.max_moves
+        # A trailing partial record is ignored
+        self.count = (len(self.data) - HEADER.size) // self.record_size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("game record index out of range")
+        offset = HEADER.size + index * self.record_size
+        timestamp, size, win_length, count, result, difficulty, players = RECORD.unpack_from(self.data, offset)
+        start = offset + RECORD.size
+        return GameRecord(
+            timestamp, size, win_length, RESULT_NAMES[result],
+            DIFFICULTY_NAMES.get(difficulty),
+            "ai" if players & X_IS_AI else "human", "ai" if players & O_IS_AI else "human",
+            tuple(self.data[start:start + count]), 3 if players & CUBE else 2,
+        )
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def moves(self, index):
+        # Zero-copy view of one game's moves
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("game record index out of range")
+        offset = HEADER.size + index * self.record_size
+        count = self.data[offset + 10]
+        start = offset + RECORD.size
+        return memoryview(self.data)[start:start + count]
+
+    def to_numpy(self):
+        # Structured array over the mapped file; needs NumPy and stays valid until close
+        import numpy as np
+
+        dtype = np.dtype([
+            ("time", "<f8"), ("size", "u1"), ("win_length", "u1"), ("move_count", "u1"), ("result", "u1"),
+            ("difficulty", "u1"), ("players", "u1"), ("reserved", "V2"), ("moves", "u1", (self.max_moves,)),
+        ])
+        return np.frombuffer(self.data, dtype=dtype, count=self.count, offset=HEADER.size)
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(data):
+    if len(data) < HEADER.size:
+        raise ValueError("Not a game record file")
+    magic, version, max_moves, record_size = HEADER.unpack(data)
+    if magic != MAGIC or version != FORMAT_VERSION or record_size != RECORD.size + max_moves:
+        raise ValueError("Not a game record file, or written by another version")
+    return max_moves
+
+
+def replay(record):
+    # Yields the board rows after every move; a cube's layers follow each other
+    board = [[" "] * record.size for _ in range(record.size ** (record.dimensions - 1))]
+    player = "X"
+    for cell in record.moves:
+        board[cell // record.size][cell % record.size] = player
+        player = "O" if player == "X" else "X"
+        yield [row[:] for row in board]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise or replay a binary game record file.")
+    parser.add_argument("path", nargs="?", default=RECORDS_PATH)
+    parser.add_argument("--replay", type=int, metavar="INDEX", help="print every position of one game")
+    args = parser.parse_args()
+
+    with GameRecordReader(args.path) as reader:
+        if args.replay is not None:
+            record = reader[args.replay]
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.time))}  "
+                  f"X: {record.x_player}  O: {record.o_player}  {record.difficulty or ''}")
+            for board in replay(record):
+                for r, row in enumerate(board):
+                    if r and not r % record.size:
+                        print()  # Next layer of a cube
+                    print(" | ".join(row))
+                print()
+            print(f"Winner: {record.winner}" if record.winner else "Draw")
+            return
+        counts = {"X": 0, "O": 0, None: 0}
+        moves = 0
+        for record in reader:
+            counts[record.winner] += 1
+            moves += len(record.moves)
+        total = len(reader)
+        print(f"{total} games, {moves / total if total else 0:.1f} moves on average")
+        print(f"X wins: {counts['X']}, O wins: {counts['O']}, draws: {counts[None]}")
+
+
+if __name__ == "__main__":
+    main()
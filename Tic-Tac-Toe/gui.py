@@ -0,0 +1,753 @@
+import datetime
+import queue
+import threading
+import time
+import tkinter as tk
+from tkinter import messagebox, filedialog, ttk
+
+from analysis import RESULT_NAMES
+from engine import TicTacToe, UltimateTicTacToe
+from game_records import GameRecordWriter, record_from_game
+from results_log import FIELDS, ResultLog
+
+# GUI implementation with tkinter
+AI_SPINNER = "◐◓◑◒"
+AI_POLL_MS = 80
+AI_MIN_DELAY_MS = 300
+LOG_FLUSH_MS = 2000
+PLAYABLE_BOARD_FILL = "#fff8d6"  # Ultimate: the small boards the next move may go in
+HINT_COLORS = {1: "#2e7d32", 0: "#757575", -1: "#c62828"}
+
+
+def hint_text(value):
+    # "win 3", "draw" or "loss 4"
+    name = RESULT_NAMES[value.outcome]
+    return name if value.outcome == 0 else f"{name} {value.plies}"
+
+
+class TicTacToeGUI:
+    def __init__(self, root, show_stats=False):
+        self.root = root
+        self.show_stats = tk.BooleanVar(value=show_stats)
+        self.show_hints = tk.BooleanVar(value=False)
+        self.stats_label = None
+        # Background AI search state; results come back through ai_results
+        self.ai_results = queue.Queue()
+        self.ai_generation = 0
+        self.ai_cancel = None
+        self.spinner_step = 0
+        self.board_canvas = None
+        self.layer_canvases = []  # One per layer of a 3D board; board_canvas is the first
+        self.sub_board_fills = []  # Ultimate only: one background and one owner mark per small board
+        self.sub_board_marks = []
+        self.canvas_hints = []  # Move value under each cell, shown from View > Move Hints
+        self.ultimate = False  # Whether the next game started is Ultimate Tic-Tac-Toe
+        self.pulse_job = None
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.bind("<Control-z>", lambda event: self.undo_move())
+        self.root.bind("<Control-y>", lambda event: self.redo_move())
+        self.root.title("Tic-Tac-Toe App")
+        self.root.geometry("500x600")
+        self.root.minsize(400, 500)
+        self.root.resizable(True, True)
+        self.is_fullscreen = False
+        self.theme = "peace"
+        self.themes = {
+            "peace": {
+                "bg": "#e3f6f5",
+                "frame_bg": "#e3f6f5",
+                "button_bg": "#bae8e8",
+                "button_fg": "#272343",
+                "active_bg": "#ffd803",
+                "active_fg": "#272343",
+                "score_bg": "#e3f6f5",
+                "status_bg": "#e3f6f5",
+                "x_fg": "#3a86ff",
+                "o_fg": "#ff006e",
+                "win_bg": "#b9fbc0",
+            },
+            "dark": {
+                "bg": "#222831",
+                "frame_bg": "#222831",
+                "button_bg": "#393E46",
+                "button_fg": "#EEEEEE",
+                "active_bg": "#00ADB5",
+                "active_fg": "#222831",
+                "score_bg": "#f0f0f0",
+                "status_bg": "#f0f0f0",
+                "x_fg": "#2196F3",
+                "o_fg": "#F44336",
+                "win_bg": "#4CAF50",
+            },
+            "light": {
+                "bg": "#f0f0f0",
+                "frame_bg": "#f0f0f0",
+                "button_bg": "#FFFFFF",
+                "button_fg": "#222831",
+                "active_bg": "#B3E5FC",
+                "active_fg": "#222831",
+                "score_bg": "#222831",
+                "status_bg": "#222831",
+                "x_fg": "#1976D2",
+                "o_fg": "#D32F2F",
+                "win_bg": "#81C784",
+            }
+        }
+        self.set_modern_style()
+        self.mode = None
+        self.ai_player = None
+        self.human_player = None
+        self.ai_difficulty = "Unbeatable"  # Default
+        self.board_options = {  # (size, win length, dimensions)
+            "3x3 (3 in a row)": (3, 3, 2),
+            "4x4 (4 in a row)": (4, 4, 2),
+            "5x5 (4 in a row)": (5, 4, 2),
+            "6x6 (5 in a row)": (6, 5, 2),
+            "7x7 (5 in a row)": (7, 5, 2),
+            "4x4x4 cube (Qubic)": (4, 4, 3),
+        }
+        self.board_choice = tk.StringVar(value="3x3 (3 in a row)")
+        self.game = TicTacToe()  # Always have a game instance
+        self.buttons = []
+        self.status_label = None
+        self.scores = {"X": 0, "O": 0, "Draw": 0}
+        self.score_label = None
+        self.results = ResultLog()  # For CSV export; keeps only recent results in memory
+        self.records = GameRecordWriter()  # Full move history of every game
+        self.root.after(LOG_FLUSH_MS, self.flush_results)
+        # Load icons if available
+        try:
+            self.x_icon = tk.PhotoImage(file="x_icon.png")
+        except Exception:
+            self.x_icon = None
+        try:
+            self.o_icon = tk.PhotoImage(file="o_icon.png")
+        except Exception:
+            self.o_icon = None
+        try:
+            self.logo_icon = tk.PhotoImage(file="logo.png")
+            self.root.iconphoto(False, self.logo_icon)
+        except Exception:
+            self.logo_icon = None
+        self.create_menu()
+        self.show_welcome_screen()
+
+    def set_modern_style(self):
+        style = ttk.Style()
+        if style.theme_use() != 'clam':
+            style.theme_use('clam')
+        style.configure('TButton', font=('Segoe UI', 16), padding=10, borderwidth=0, relief='flat')
+        style.configure('TLabel', font=('Segoe UI', 14), background=self.themes[self.theme]['bg'], foreground=self.themes[self.theme]['button_fg'])
+        style.configure('TFrame', background=self.themes[self.theme]['frame_bg'])
+        style.map('TButton', background=[('active', self.themes[self.theme]['active_bg'])])
+        self.root.configure(bg=self.themes[self.theme]['bg'])
+
+    def toggle_fullscreen(self):
+        self.is_fullscreen = not self.is_fullscreen
+        self.root.attributes("-fullscreen", self.is_fullscreen)
+
+    def get_theme(self, key):
+        return self.themes[self.theme][key]
+
+    def toggle_theme(self):
+        self.theme = "light" if self.theme == "dark" else "dark"
+        self.apply_theme()
+
+    def apply_theme(self):
+        # Restyles the widgets and canvas items in place instead of rebuilding the screen
+        self.set_modern_style()
+        if self.board_canvas is not None:
+            for r, row in enumerate(self.rendered_symbols):
+                for c, symbol in enumerate(row):
+                    if symbol != " ":
+                        self.render_cell(r, c, symbol)
+            self.update_sub_boards()
+
+    def create_menu(self):
+        menubar = tk.Menu(self.root)
+        game_menu = tk.Menu(menubar, tearoff=0)
+        game_menu.add_command(label="New Game", command=self.show_welcome_screen)
+        game_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo_move)
+        game_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo_move)
+        game_menu.add_command(label="Export Results to CSV", command=self.export_results_to_csv)
+        game_menu.add_command(label="Toggle Fullscreen", command=self.toggle_fullscreen)
+        game_menu.add_separator()
+        game_menu.add_command(label="Exit", command=self.on_close)
+        menubar.add_cascade(label="Game", menu=game_menu)
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_command(label="Toggle Theme", command=self.toggle_theme)
+        view_menu.add_command(label="Recent Results", command=self.show_recent_results)
+        view_menu.add_checkbutton(label="Search Stats", variable=self.show_stats, command=self.apply_stats_setting)
+        view_menu.add_checkbutton(label="Move Hints", variable=self.show_hints, command=self.update_hints)
+        menubar.add_cascade(label="View", menu=view_menu)
+        help_menu = tk.Menu(menubar, tearoff=0)
+        help_menu.add_command(label="About", command=self.show_about)
+        menubar.add_cascade(label="Help", menu=help_menu)
+        # Add logo to menu if available
+        if getattr(self, 'logo_icon', None) is not None and self.logo_icon is not None:
+            menubar.add_command(image=self.logo_icon, compound="left")
+        self.root.config(menu=menubar)
+
+    def show_recent_results(self):
+        # Newest first, from the log's in-memory ring buffer; Export covers the rest
+        window = tk.Toplevel(self.root)
+        window.title("Recent Results")
+        window.geometry("420x320")
+        table = ttk.Treeview(window, columns=FIELDS, show="headings")
+        for field in FIELDS:
+            table.heading(field, text=field)
+            table.column(field, width=140 if field == "Time" else 100, anchor="center")
+        for result in reversed(self.results.recent):
+            table.insert("", tk.END, values=[result.get(field, "") for field in FIELDS])
+        scrollbar = ttk.Scrollbar(window, orient=tk.VERTICAL, command=table.yview)
+        table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        table.pack(expand=True, fill=tk.BOTH)
+        if not self.results.recent:
+            ttk.Label(window, text="No games finished yet").place(relx=0.5, rely=0.5, anchor="center")
+
+    def show_about(self):
+        messagebox.showinfo("About", "Tic-Tac-Toe App\nMade with Tkinter\nEnjoy!")
+
+    def show_welcome_screen(self):
+        self.cancel_ai()
+        self.clear_window()
+        frame = ttk.Frame(self.root, style='TFrame')
+        frame.pack(expand=True, fill=tk.BOTH, padx=30, pady=30)
+        label = ttk.Label(frame, text="Welcome to Tic-Tac-Toe!", font=("Segoe UI", 24, "bold"), anchor="center")
+        label.pack(pady=30)
+        self.ultimate = False
+        btn_human = ttk.Button(frame, text="Play vs Human", command=self.start_human)
+        btn_ai = ttk.Button(frame, text="Play vs AI", command=self.setup_ai_selection)
+        btn_ultimate = ttk.Button(frame, text="Play Ultimate", command=self.setup_ultimate)
+        btn_human.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        btn_ai.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        btn_ultimate.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        size_label = ttk.Label(frame, text="Board", anchor="center")
+        size_label.pack(pady=(15, 5))
+        size_box = ttk.Combobox(frame, textvariable=self.board_choice, values=list(self.board_options), state="readonly", font=("Segoe UI", 14))
+        size_box.pack(pady=5, fill='x')
+
+    def new_game(self, ai_player=None, human_player=None):
+        if self.ultimate:
+            game = UltimateTicTacToe(ai_player=ai_player, human_player=human_player, difficulty=self.ai_difficulty)
+            if self.show_stats.get():
+                game.enable_stats(self.update_stats_label)
+            return game
+        size, win_length, dimensions = self.board_options[self.board_choice.get()]
+        game = TicTacToe(ai_player=ai_player, human_player=human_player, size=size, win_length=win_length,
+                         difficulty=self.ai_difficulty, dimensions=dimensions)
+        if self.show_stats.get():
+            game.enable_stats(self.update_stats_label)
+        return game
+
+    def apply_stats_setting(self):
+        if self.show_stats.get():
+            if self.game.stats is None:
+                self.game.enable_stats(self.update_stats_label)
+            if self.stats_label is not None:
+                self.stats_label.pack(after=self.status_label, pady=(0, 10))
+        else:
+            self.game.disable_stats()
+            if self.stats_label is not None:
+                self.stats_label.pack_forget()
+
+    def update_stats_label(self, stats):
+        if self.stats_label is not None:
+            self.stats_label.config(text=str(stats))
+
+    def setup_mode_selection(self):
+        self.show_welcome_screen()
+
+    def setup_ultimate(self):
+        # Nine boards in one; the board choice on the welcome screen does not apply
+        self.clear_window()
+        self.ultimate = True
+        frame = ttk.Frame(self.root, style='TFrame')
+        frame.pack(expand=True, fill=tk.BOTH, padx=30, pady=30)
+        label = ttk.Label(frame, text="Ultimate Tic-Tac-Toe", font=("Segoe UI", 20, "bold"), anchor="center")
+        label.pack(pady=20)
+        rules = ttk.Label(frame, text="Where you play in a small board sends\nyour opponent to that board.", font=("Segoe UI", 12), anchor="center")
+        rules.pack(pady=(0, 20))
+        btn_human = ttk.Button(frame, text="Play vs Human", command=self.start_human)
+        btn_ai = ttk.Button(frame, text="Play vs AI", command=self.setup_ai_selection)
+        btn_human.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        btn_ai.pack(pady=15, ipadx=10, ipady=5, fill='x')
+
+    def setup_ai_selection(self):
+        self.clear_window()
+        frame = ttk.Frame(self.root, style='TFrame')
+        frame.pack(expand=True, fill=tk.BOTH, padx=30, pady=30)
+        label = ttk.Label(frame, text="Do you want to be X or O? (X goes first)", font=("Segoe UI", 16), anchor="center")
+        label.pack(pady=20)
+        btn_x = ttk.Button(frame, text="X", command=lambda: self.setup_ai_difficulty("X"))
+        btn_o = ttk.Button(frame, text="O", command=lambda: self.setup_ai_difficulty("O"))
+        btn_x.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        btn_o.pack(pady=15, ipadx=10, ipady=5, fill='x')
+
+    def setup_ai_difficulty(self, human):
+        self.clear_window()
+        frame = ttk.Frame(self.root, style='TFrame')
+        frame.pack(expand=True, fill=tk.BOTH, padx=30, pady=30)
+        label = ttk.Label(frame, text="Select AI Difficulty", font=("Segoe UI", 16), anchor="center")
+        label.pack(pady=20)
+        btn_easy = ttk.Button(frame, text="Easy", command=lambda: self.start_ai(human, "Easy"))
+        btn_unbeatable = ttk.Button(frame, text="Unbeatable", command=lambda: self.start_ai(human, "Unbeatable"))
+        btn_easy.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        btn_unbeatable.pack(pady=15, ipadx=10, ipady=5, fill='x')
+        if not self.ultimate:
+            btn_mcts = ttk.Button(frame, text="Monte Carlo", command=lambda: self.start_ai(human, "Monte Carlo"))
+            btn_mcts.pack(pady=15, ipadx=10, ipady=5, fill='x')
+
+    def start_human(self):
+        self.game = self.new_game()
+        self.draw_board()
+
+    def start_ai(self, human, difficulty):
+        ai = "O" if human == "X" else "X"
+        self.ai_difficulty = difficulty
+        self.game = self.new_game(ai_player=ai, human_player=human)
+        self.draw_board()
+        if self.game.current_player == self.game.ai_player:
+            self.ai_move()
+
+    def draw_board(self):
+        self.clear_window()
+        n = self.game.size
+        rows = n ** (self.game.dimensions - 1)
+        ultimate = isinstance(self.game, UltimateTicTacToe)
+        canvas_frame = ttk.Frame(self.root, style='TFrame')
+        canvas_frame.pack(expand=True, fill=tk.BOTH, padx=0, pady=0)
+        # A 3D board gets one canvas per layer, stacked top to bottom
+        layers = rows // n
+        side = 420 if layers == 1 else 110
+        self.layer_canvases = []
+        self.grid_lines = []
+        self.layouts = []
+        for layer in range(layers):
+            canvas = tk.Canvas(canvas_frame, width=side, height=side, bg="white", highlightthickness=0)
+            canvas.pack(expand=True, fill=tk.BOTH, pady=10 if layers == 1 else 3)
+            canvas.bind("<Button-1>", lambda event, layer=layer: self.on_canvas_click(event, layer))
+            canvas.bind("<Configure>", lambda event, layer=layer: self.on_canvas_resize(event, layer))
+            self.layer_canvases.append(canvas)
+            width = 4 if layers == 1 else 2
+            self.grid_lines.append([
+                # Ultimate draws the small boards' own lines thin
+                canvas.create_line(0, 0, 0, 0, fill="black", width=1 if ultimate and i % 3 else width, tags="grid")
+                for i in range(1, n) for _ in range(2)
+            ])
+            self.layouts.append((0, 0, 1))
+        self.board_canvas = self.layer_canvases[0]
+        # Every canvas item is created once here; moves, animations, themes and
+        # resizes only reconfigure them
+        self.canvas_win_highlights = [
+            [self.canvas_for_row(r).create_rectangle(0, 0, 0, 0, outline="#b9fbc0", width=8 if layers == 1 else 4, state="hidden", tags="win") for _ in range(n)]
+            for r in range(rows)
+        ]
+        self.canvas_symbols = [
+            [(self.canvas_for_row(r).create_text(0, 0, text="", tags="symbol"), self.canvas_for_row(r).create_image(0, 0, state="hidden", tags="symbol")) for _ in range(n)]
+            for r in range(rows)
+        ]
+        self.rendered_symbols = [[" "] * n for _ in range(rows)]
+        self.canvas_hints = [] if ultimate else [
+            [self.canvas_for_row(r).create_text(0, 0, text="", state="hidden", tags="hint") for _ in range(n)]
+            for r in range(rows)
+        ]
+        self.sub_board_fills = []
+        self.sub_board_marks = []
+        if ultimate:
+            canvas = self.board_canvas
+            self.sub_board_fills = [canvas.create_rectangle(0, 0, 0, 0, fill="", width=0, tags="sub") for _ in range(9)]
+            canvas.tag_lower("sub")
+            self.sub_board_marks = [canvas.create_text(0, 0, text="", state="hidden", tags="mark") for _ in range(9)]
+        for layer in range(layers):
+            self.layout_board(layer, side, side)
+        # Score label
+        self.score_label = ttk.Label(self.root, text=self.get_score_text(), font=("Segoe UI", 14, "bold"), anchor="center")
+        self.score_label.pack(pady=10)
+        self.status_label = ttk.Label(self.root, text=f"Player {self.game.current_player}'s turn", font=("Segoe UI", 16), anchor="center")
+        self.status_label.pack(pady=10)
+        # Search debug overlay, shown from View > Search Stats
+        self.stats_label = ttk.Label(self.root, text="Search stats appear after the AI moves", font=("Consolas", 10), anchor="center")
+        if self.show_stats.get():
+            self.stats_label.pack(pady=(0, 10))
+        # Add logo to the top left if available
+        if getattr(self, 'logo_icon', None) is not None and self.logo_icon is not None:
+            logo_label = ttk.Label(self.root, image=self.logo_icon)
+            logo_label.place(x=10, y=10)
+        self.update_board()
+
+    def canvas_for_row(self, r):
+        # Rows of a 3D board run down through the layers
+        return self.layer_canvases[r // self.game.size]
+
+    def layout_board(self, layer, width, height):
+        # Centers the largest square board that fits and moves every item into place
+        n = self.game.size
+        canvas = self.layer_canvases[layer]
+        size = max(min(width, height), 60)
+        cell = size // n
+        x0, y0 = (width - cell * n) // 2, (height - cell * n) // 2
+        self.layouts[layer] = x0, y0, cell
+        end = cell * n
+        lines = self.grid_lines[layer]
+        for i in range(1, n):
+            canvas.coords(lines[2 * i - 2], x0 + i * cell, y0, x0 + i * cell, y0 + end)
+            canvas.coords(lines[2 * i - 1], x0, y0 + i * cell, x0 + end, y0 + i * cell)
+        font = ("Segoe UI", max(12, cell * 48 // 140), "bold")
+        hint_font = ("Segoe UI", max(7, cell // 9))
+        inset = min(8, cell // 10)
+        for r in range(n):
+            for c in range(n):
+                x = x0 + c * cell
+                y = y0 + r * cell
+                row = layer * n + r
+                canvas.coords(self.canvas_win_highlights[row][c], x + inset, y + inset, x + cell - inset, y + cell - inset)
+                text_item, image_item = self.canvas_symbols[row][c]
+                canvas.coords(text_item, x + cell // 2, y + cell // 2)
+                canvas.coords(image_item, x + cell // 2, y + cell // 2)
+                canvas.itemconfig(text_item, font=font)
+                if self.canvas_hints:
+                    hint = self.canvas_hints[row][c]
+                    canvas.coords(hint, x + cell // 2, y + cell - max(6, cell // 7))
+                    canvas.itemconfig(hint, font=hint_font)
+        big_font = ("Segoe UI", max(24, cell * 2), "bold")
+        for b, (rect, mark) in enumerate(zip(self.sub_board_fills, self.sub_board_marks)):
+            x = x0 + b % 3 * 3 * cell
+            y = y0 + b // 3 * 3 * cell
+            canvas.coords(rect, x, y, x + 3 * cell, y + 3 * cell)
+            canvas.coords(mark, x + 3 * cell // 2, y + 3 * cell // 2)
+            canvas.itemconfig(mark, font=big_font)
+
+    def on_canvas_resize(self, event, layer=0):
+        self.layout_board(layer, event.width, event.height)
+
+    def render_cell(self, r, c, symbol):
+        canvas = self.canvas_for_row(r)
+        text_item, image_item = self.canvas_symbols[r][c]
+        icon = self.x_icon if symbol == "X" else self.o_icon if symbol == "O" else None
+        if icon:
+            canvas.itemconfig(image_item, image=icon, state="normal")
+            canvas.itemconfig(text_item, state="hidden")
+        else:
+            canvas.itemconfig(image_item, state="hidden")
+            fill = self.get_theme("x_fg") if symbol == "X" else self.get_theme("o_fg")
+            canvas.itemconfig(text_item, text=symbol.strip(), fill=fill, state="normal")
+        self.rendered_symbols[r][c] = symbol
+
+    def on_canvas_click(self, event, layer=0):
+        x0, y0, cell = self.layouts[layer]
+        if event.x < x0 or event.y < y0:
+            return
+        col = (event.x - x0) // cell
+        row = (event.y - y0) // cell
+        if 0 <= row < self.game.size and 0 <= col < self.game.size:
+            self.on_click(layer * self.game.size + row, col)
+
+    def get_score_text(self):
+        return f"X: {self.scores['X']}    O: {self.scores['O']}    Draws: {self.scores['Draw']}"
+
+    def update_score_label(self):
+        if self.score_label is not None:
+            self.score_label.config(text=self.get_score_text())
+
+    def update_board(self):
+        # Only cells whose symbol differs from what is on the canvas are touched
+        for r, rendered in enumerate(self.rendered_symbols):
+            for c in range(self.game.size):
+                symbol = self.game.get_cell(r, c)
+                if symbol != rendered[c]:
+                    self.render_cell(r, c, symbol)
+        winning = set(self.game.winning_cells)
+        for r, row in enumerate(self.canvas_win_highlights):
+            canvas = self.canvas_for_row(r)
+            for c, rect in enumerate(row):
+                if (r, c) in winning:
+                    canvas.itemconfig(rect, outline="#b9fbc0", state="normal")
+                else:
+                    canvas.itemconfig(rect, state="hidden")
+        self.update_sub_boards()
+        self.update_hints()
+
+    def update_hints(self):
+        # Solved values of the human's moves; hidden while the AI is to move and once the game
+        # is over. Only 3x3 and tablebase boards get hints: a search short enough for the Tk
+        # thread settles nothing on larger boards
+        if not self.canvas_hints:
+            return
+        game = self.game
+        values = {}
+        if self.show_hints.get() and not (game.ai_player and game.current_player == game.ai_player):
+            values = {(v.row, v.col): v for v in game.analyze(exact_only=True) or ()}
+        for r, row in enumerate(self.canvas_hints):
+            canvas = self.canvas_for_row(r)
+            for c, item in enumerate(row):
+                value = values.get((r, c))
+                if value is None:
+                    canvas.itemconfig(item, state="hidden")
+                else:
+                    canvas.itemconfig(item, text=hint_text(value), fill=HINT_COLORS[value.outcome], state="normal")
+
+    def update_sub_boards(self):
+        # Ultimate: shades the boards the next move may go in and marks won boards
+        if not self.sub_board_fills:
+            return
+        state = self.game.state
+        legal = state.legal_mask()
+        for b, (rect, mark) in enumerate(zip(self.sub_board_fills, self.sub_board_marks)):
+            self.board_canvas.itemconfig(rect, fill=PLAYABLE_BOARD_FILL if legal >> (9 * b) & 511 else "")
+            owner = state.board_owner(b)
+            if owner:
+                fill = self.get_theme("x_fg") if owner == "X" else self.get_theme("o_fg")
+                self.board_canvas.itemconfig(mark, text=owner, fill=fill, state="normal")
+            else:
+                self.board_canvas.itemconfig(mark, state="hidden")
+
+    def on_click(self, row, col):
+        if not self.game.is_valid_move(row, col) or (self.game.ai_player and self.game.current_player == self.game.ai_player):
+            return
+        self.game.make_move(row, col, self.game.current_player)
+        self.update_board()
+        winner = self.game.check_winner()
+        if winner:
+            if self.status_label is not None:
+                self.status_label.config(text=f"Player {winner} wins!")
+            self.show_game_over(f"Player {winner} wins!")
+            return
+        elif self.game.is_draw():
+            if self.status_label is not None:
+                self.status_label.config(text="It's a draw!")
+            self.show_game_over("It's a draw!")
+            return
+        if self.status_label is not None:
+            self.status_label.config(text=f"Player {self.game.current_player}'s turn")
+        if self.game.ai_player and self.game.current_player == self.game.ai_player:
+            self.ai_move()
+
+    def ai_move(self):
+        # Search on a snapshot in a worker thread; poll_ai_move applies the result
+        self.cancel_ai()
+        generation = self.ai_generation
+        snapshot = self.game.copy()
+        self.ai_cancel = snapshot.cancel_event = threading.Event()
+        if self.game.stats is not None:
+            snapshot.enable_stats()
+
+        def search():
+            # Always answers, so the poller never waits on a search that died
+            try:
+                move = snapshot.choose_move(snapshot.ai_player)
+            except Exception as e:
+                self.ai_results.put((generation, None, None, e))
+            else:
+                self.ai_results.put((generation, move, snapshot.stats, None))
+
+        threading.Thread(target=search, daemon=True).start()
+        self.spinner_step = 0
+        self.poll_ai_move(generation, time.perf_counter())
+
+    def poll_ai_move(self, generation, started):
+        if generation != self.ai_generation:
+            return
+        result = None
+        while not self.ai_results.empty():
+            result = self.ai_results.get_nowait()
+            if result[0] == generation:
+                break
+            result = None  # Left over from a cancelled search
+        if result is None:
+            if self.status_label is not None:
+                frame = AI_SPINNER[self.spinner_step % len(AI_SPINNER)]
+                self.status_label.config(text=f"AI ({self.game.ai_player}) is thinking {frame}")
+            self.spinner_step += 1
+            self.root.after(AI_POLL_MS, lambda: self.poll_ai_move(generation, started))
+            return
+        # Short searches still wait AI_MIN_DELAY_MS in total so the move is visible
+        remaining = AI_MIN_DELAY_MS - int((time.perf_counter() - started) * 1000)
+        self.root.after(max(remaining, 0), lambda: self.finish_ai_move(*result))
+
+    def cancel_ai(self):
+        # Invalidates any running search; its result is ignored when it arrives
+        self.ai_generation += 1
+        if self.ai_cancel is not None:
+            self.ai_cancel.set()
+            self.ai_cancel = None
+
+    def finish_ai_move(self, generation, move, stats, error):
+        if generation != self.ai_generation:
+            return
+        self.ai_cancel = None
+        if error is not None:
+            self.ai_failed(error)
+            return
+        if move:
+            row, col = move
+            self.game.make_move(row, col, self.game.ai_player)
+        if stats is not None:
+            self.update_stats_label(stats)
+        self.update_board()
+        winner = self.game.check_winner()
+        if winner:
+            if self.status_label is not None:
+                self.status_label.config(text=f"Player {winner} wins!")
+            self.show_game_over(f"Player {winner} wins!")
+            return
+        elif self.game.is_draw():
+            if self.status_label is not None:
+                self.status_label.config(text="It's a draw!")
+            self.show_game_over("It's a draw!")
+            return
+        if self.status_label is not None:
+            self.status_label.config(text=f"Player {self.game.current_player}'s turn")
+
+    def ai_failed(self, error):
+        # Retry, or take back the human's last move so the board is playable again
+        game = self.game
+        if self.status_label is not None:
+            self.status_label.config(text=f"AI ({game.ai_player}) could not move")
+        if messagebox.askretrycancel("AI Error", f"The AI could not choose a move:\n{error}"):
+            self.ai_move()
+            return
+        while game.moves and game.current_player == game.ai_player:
+            game.undo_move()
+        self.refresh_turn()
+        if game.current_player == game.ai_player and self.status_label is not None:
+            # Nothing to take back when the AI moves first
+            self.status_label.config(text=f"AI ({game.ai_player}) could not move; start a new game")
+
+    def undo_move(self):
+        # Against the AI, takes back moves until it is the human's turn again
+        game = self.game
+        if self.board_canvas is None or game.check_winner() or game.is_draw():
+            return
+        if game.ai_player and len(game.moves) <= (1 if game.ai_player == "X" else 0):
+            return
+        if not game.moves:
+            return
+        self.cancel_ai()
+        game.undo_move()
+        while game.ai_player and game.moves and game.current_player == game.ai_player:
+            game.undo_move()
+        self.refresh_turn()
+
+    def redo_move(self):
+        game = self.game
+        if self.board_canvas is None or not game.redo_moves:
+            return
+        self.cancel_ai()
+        game.redo_move()
+        while game.ai_player and game.redo_moves and game.current_player == game.ai_player:
+            game.redo_move()
+        self.refresh_turn()
+        if game.ai_player and game.current_player == game.ai_player:
+            self.ai_move()
+
+    def refresh_turn(self):
+        self.update_board()
+        if self.status_label is not None:
+            self.status_label.config(text=f"Player {self.game.current_player}'s turn")
+
+    def show_game_over(self, message):
+        # Update scores
+        if "Player X wins" in message:
+            self.scores["X"] += 1
+            winner = "X"
+        elif "Player O wins" in message:
+            self.scores["O"] += 1
+            winner = "O"
+        elif "draw" in message.lower():
+            self.scores["Draw"] += 1
+            winner = "Draw"
+        else:
+            winner = "Unknown"
+        # Record game result
+        now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        difficulty = self.ai_difficulty if self.game.ai_player else "N/A"
+        self.results.append({
+            "Time": now,
+            "Winner": winner,
+            "Difficulty": difficulty
+        })
+        if not isinstance(self.game, UltimateTicTacToe):
+            # Ultimate games are left out of games.bin: they can run to 81 moves,
+            # past MAX_MOVES, and a record has no field for the nine-board rules.
+            # Their results still go to the result log above
+            self.records.write(record_from_game(self.game))
+        self.update_score_label()
+        self.update_board()  # Ensure highlight is shown
+        if winner in ("X", "O"):
+            self.celebrate_win(self.game.winning_cells)
+        result = messagebox.askquestion("Game Over", f"{message}\n\nDo you want to play again?", icon='info')
+        if result == 'yes':
+            self.show_welcome_screen()
+        else:
+            self.root.quit()
+
+    def end_game(self, message):
+        # Deprecated, replaced by show_game_over
+        self.show_game_over(message)
+
+    def on_close(self):
+        self.cancel_ai()
+        self.results.close()
+        self.records.close()
+        self.root.destroy()
+
+    def flush_results(self):
+        self.results.flush()
+        self.records.flush()
+        self.root.after(LOG_FLUSH_MS, self.flush_results)
+
+    def clear_window(self):
+        if self.pulse_job is not None:
+            self.root.after_cancel(self.pulse_job)
+            self.pulse_job = None
+        for widget in self.root.winfo_children():
+            widget.destroy()
+        self.stats_label = None
+        self.board_canvas = None
+        self.layer_canvases = []
+        self.canvas_hints = []
+        self.sub_board_fills = []
+        self.sub_board_marks = []
+
+    def export_results_to_csv(self):
+        self.results.flush()
+        if not self.results.paths():
+            messagebox.showinfo("Export Results", "No game results to export yet.")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv")],
+            title="Save Game Results As..."
+        )
+        if not file_path:
+            return
+        try:
+            count = self.results.export_csv(file_path)
+            messagebox.showinfo("Export Results", f"{count} results exported to {file_path}")
+        except Exception as e:
+            messagebox.showerror("Export Error", f"Failed to export results:\n{e}")
+
+    def celebrate_win(self, cells):
+        # Simple color pulse animation for winning cells
+        colors = ["#fff3b0", "#f9c74f", "#b9fbc0", self.get_theme("win_bg")]
+        rects = [(self.canvas_for_row(r), self.canvas_win_highlights[r][c]) for (r, c) in cells]
+        def pulse(step=0):
+            color = colors[step % len(colors)]
+            for canvas, rect in rects:
+                canvas.itemconfig(rect, outline=color, state="normal")
+            if step < 8:
+                self.pulse_job = self.root.after(120, lambda: pulse(step+1))
+            else:
+                self.pulse_job = None
+        pulse()
+
+
+def run_gui(show_stats=False):
+    root = tk.Tk()
+    app = TicTacToeGUI(root, show_stats)
+    root.mainloop()
+    # Also reached through root.quit, which skips on_close
+    app.results.close()
+    app.records.close()
@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmark import percentile
+from server import MAX_LINE
+
+# Many concurrent random-move clients against server.py, all in one event loop.
+# Turn latency is from sending a move until it is this client's turn again (or
+# the game ends), so against the AI it includes the AI's thinking time.
+
+
+class LoadClient:
+    def __init__(self, host, port, opponent, size, win_length, difficulty, rng):
+        self.host = host
+        self.port = port
+        self.request = {"type": "play", "opponent": opponent, "size": size, "difficulty": difficulty}
+        if win_length is not None:
+            self.request["win_length"] = win_length
+        self.rng = rng
+        self.latencies = []
+        self.results = {"win": 0, "loss": 0, "draw": 0}
+        self.errors = 0
+
+    async def run(self, games):
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE)
+        try:
+            for _ in range(games):
+                await self.play_game(reader, writer)
+        finally:
+            writer.close()
+
+    def send(self, writer, message):
+        writer.write((json.dumps(message) + "\n").encode())
+
+    async def play_game(self, reader, writer):
+        request = dict(self.request, side=self.rng.choice("XO"))
+        self.send(writer, request)
+        empty = None
+        me = None
+        to_move = "X"
+        sent_at = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("server closed the connection")
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "start":
+                me = message["you"]
+                empty = [(row, col) for row in range(message["size"]) for col in range(message["size"])]
+            elif kind == "move":
+                empty.remove((message["row"], message["col"]))
+                to_move = message["turn"]
+                if to_move != me:
+                    continue
+            elif kind == "over":
+                if sent_at is not None:
+                    self.latencies.append(time.perf_counter() - sent_at)
+                if message["winner"] is None:
+                    self.results["draw"] += 1
+                else:
+                    self.results["win" if message["winner"] == me else "loss"] += 1
+                return
+            elif kind == "error":
+                self.errors += 1
+                continue
+            else:
+                continue
+            if to_move == me:
+                if sent_at is not None:
+                    self.latencies.append(time.perf_counter() - sent_at)
+                row, col = self.rng.choice(empty)
+                sent_at = time.perf_counter()
+                self.send(writer, {"type": "move", "row": row, "col": col})
+                await writer.drain()
+
+
+async def run_load(args):
+    rng = random.Random(args.seed)
+    clients = [
+        LoadClient(args.host, args.port, args.opponent, args.size, args.win_length, args.difficulty,
+                   random.Random(rng.random()))
+        for _ in range(args.clients)
+    ]
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(client.run(args.games) for client in clients), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failed = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    latencies = [latency for client in clients for latency in client.latencies]
+    totals = {key: sum(client.results[key] for client in clients) for key in ("win", "loss", "draw")}
+    games = sum(totals.values())
+    # Two clients share every human-vs-human game
+    sessions = games // 2 if args.opponent == "human" else games
+    print(f"{args.clients} clients, {sessions} games in {elapsed:.2f}s ({sessions / elapsed:.0f} games/s)")
+    print(f"Client results: {totals['win']} wins, {totals['loss']} losses, {totals['draw']} draws")
+    if latencies:
+        print(
+            f"Turn latency: p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+            f"p90 {percentile(latencies, 0.9) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms"
+        )
+    errors = sum(client.errors for client in clients)
+    if errors or failed:
+        print(f"{errors} protocol errors, {len(failed)} failed clients")
+        if failed:
+            print(f"First failure: {failed[0]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test server.py with many concurrent random-move clients.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=100, help="concurrent connections")
+    parser.add_argument("--games", type=int, default=10, help="games per client")
+    parser.add_argument("--opponent", choices=["ai", "human"], default="ai",
+                        help="human pairs the clients up through matchmaking")
+    parser.add_argument("--difficulty", default="Unbeatable")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    if args.opponent == "human" and args.clients % 2:
+        parser.error("--clients must be even when clients play each other")
+    asyncio.run(run_load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from bitboard import CELLS, FULL_MASK, IS_WIN, WIN_MASKS, iter_bits
+
+# Perfect-play table for the 3x3 board.
+# Layout: header, then one 2-byte entry per base-3 position index
+# (cell i contributes 3**i * {0: empty, 1: X, 2: O}). Each entry is
+# (best move cell or NO_MOVE, signed score for the side to move).
+MAGIC = b"TTTB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")  # magic, version, win_score, fingerprint, entry count
+ENTRY_SIZE = 2
+ENTRY_COUNT = 3 ** CELLS
+NO_MOVE = 255
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect_play.bin")
+
+_X_DIGITS = tuple(sum(3 ** i for i in iter_bits(mask)) for mask in range(FULL_MASK + 1))
+_O_DIGITS = tuple(2 * d for d in _X_DIGITS)
+
+
+def position_index(x, o):
+    return _X_DIGITS[x] + _O_DIGITS[o]
+
+
+def fingerprint():
+    # Changes whenever the board geometry or the file format changes
+    return zlib.crc32(repr((FORMAT_VERSION, CELLS, WIN_MASKS)).encode())
+
+
+class PerfectPlayTable:
+    def __init__(self, file, data):
+        self.file = file
+        self.data = data
+
+    def lookup(self, x, o):
+        # Returns (move cell, score for the side to move) or None
+        offset = HEADER.size + position_index(x, o) * ENTRY_SIZE
+        move = self.data[offset]
+        if move == NO_MOVE:
+            return None
+        score = self.data[offset + 1]
+        return move, score - 256 if score > 127 else score
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def load_table(win_score, path=TABLE_PATH):
+    # Returns None if the file is missing, truncated or built for another engine
+    try:
+        file = open(path, "rb")
+    except OSError:
+        return None
+    try:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        file.close()
+        return None
+    valid = len(data) == HEADER.size + ENTRY_COUNT * ENTRY_SIZE
+    if valid:
+        magic, version, table_win_score, table_fingerprint, count = HEADER.unpack_from(data)
+        valid = (
+            magic == MAGIC
+            and version == FORMAT_VERSION
+            and table_win_score == win_score
+            and table_fingerprint == fingerprint()
+            and count == ENTRY_COUNT
+        )
+    if not valid:
+        data.close()
+        file.close()
+        return None
+    return PerfectPlayTable(file, data)
+
+
+def solve_entries():
+    # Entry bytes for every position index, as stored after the file header
+    from engine import TicTacToe, WIN_SCORE
+
+    entries = bytearray([NO_MOVE, 0]) * ENTRY_COUNT
+    game = TicTacToe()
+    seen = set()
+
+    def solve(x, o):
+        index = position_index(x, o)
+        if index in seen:
+            return
+        seen.add(index)
+        if IS_WIN[x] or IS_WIN[o] or (x | o) == FULL_MASK:
+            return
+        x_to_move = bin(x).count("1") == bin(o).count("1")
+        mine, theirs = (x, o) if x_to_move else (o, x)
+        score, move = game._minimax(True, mine, theirs, 0, -WIN_SCORE - 1, WIN_SCORE + 1)
+        entries[index * ENTRY_SIZE] = move
+        entries[index * ENTRY_SIZE + 1] = score & 0xFF
+        for i in iter_bits(FULL_MASK & ~(x | o)):
+            if x_to_move:
+                solve(x | (1 << i), o)
+            else:
+                solve(x, o | (1 << i))
+
+    solve(0, 0)
+    return entries, len(seen)
+
+
+def build_table(path=TABLE_PATH):
+    from engine import WIN_SCORE
+
+    entries, positions = solve_entries()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, WIN_SCORE, fingerprint(), ENTRY_COUNT))
+        f.write(entries)
+    os.replace(tmp_path, path)
+    return positions
+
+
+if __name__ == "__main__":
+    out = sys.argv[1] if len(sys.argv) > 1 else TABLE_PATH
+    positions = build_table(out)
+    print(f"Wrote {positions} positions to {out}")
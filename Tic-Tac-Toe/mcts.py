@@ -0,0 +1,148 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import geometry, iter_bits
+
+# Monte Carlo Tree Search with UCT selection and random playouts.
+# Root-parallel: each worker grows its own tree and only the root visit counts
+# are merged.
+EXPLORATION = 1.4
+_pool = None
+_pool_workers = 0
+
+
+class Node:
+    __slots__ = ("move", "parent", "children", "untried", "mine", "theirs", "visits", "wins", "result")
+
+    def __init__(self, geo, move, parent, mine, theirs, result):
+        # mine belongs to the side to move in this node; wins are counted for the
+        # side that made `move`, i.e. the owner of theirs
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.mine = mine
+        self.theirs = theirs
+        self.visits = 0
+        self.wins = 0.0
+        self.result = result  # None while the game goes on, else 1.0 (mover won) or 0.5 (draw)
+        self.untried = [] if result is not None else list(iter_bits(geo.full_mask & ~(mine | theirs)))
+
+    def select_child(self):
+        log_visits = math.log(self.visits)
+        best = None
+        best_value = -1.0
+        for child in self.children:
+            value = child.wins / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+
+def _expand(geo, node, rng):
+    move = node.untried.pop(rng.randrange(len(node.untried)))
+    bit = 1 << move
+    played = node.mine | bit
+    if geo.wins_through(played, move):
+        result = 1.0
+    elif (played | node.theirs) == geo.full_mask:
+        result = 0.5
+    else:
+        result = None
+    child = Node(geo, move, node, node.theirs, played, result)
+    node.children.append(child)
+    return child
+
+
+def _playout(geo, mine, theirs, rng):
+    # Random game from a non-terminal node; returns the score for the side
+    # that did NOT move next (the owner of theirs)
+    cells = list(iter_bits(geo.full_mask & ~(mine | theirs)))
+    rng.shuffle(cells)
+    to_move = 0
+    sides = [mine, theirs]
+    for i in cells:
+        sides[to_move] |= 1 << i
+        if geo.wins_through(sides[to_move], i):
+            return 0.0 if to_move == 0 else 1.0
+        to_move ^= 1
+    return 0.5
+
+
+def run_tree(size, win_length, mine, theirs, playouts=None, time_budget_ms=None, seed=None, cancel_event=None,
+             dimensions=2):
+    # Grows one tree and returns {move: visits} for the root
+    if playouts is None and not time_budget_ms:
+        raise ValueError("MCTS needs a playout count or a time budget")
+    geo = geometry(size, win_length, dimensions)
+    rng = random.Random(seed)
+    root = Node(geo, None, None, mine, theirs, None)
+    deadline = time.perf_counter() + time_budget_ms / 1000.0 if time_budget_ms else None
+    done = 0
+    while True:
+        if playouts is not None and done >= playouts:
+            break
+        if not done & 63 and (
+            (deadline is not None and time.perf_counter() > deadline)
+            or (cancel_event is not None and cancel_event.is_set())
+        ):
+            break
+        node = root
+        while not node.untried and node.children:
+            node = node.select_child()
+        if node.untried:
+            node = _expand(geo, node, rng)
+        if node.result is not None:
+            score = node.result
+        else:
+            score = _playout(geo, node.mine, node.theirs, rng)
+        while node is not None:
+            node.visits += 1
+            node.wins += score
+            score = 1.0 - score
+            node = node.parent
+        done += 1
+    return {child.move: child.visits for child in root.children}
+
+
+def _get_pool(workers):
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def mcts_move(geo, mine, theirs, playouts=None, time_budget_ms=1000, workers=None, stats=None,
+              cancel_event=None, seed=None):
+    # Most visited root move across all trees, as a cell index. A seed with a playout
+    # count and no time budget makes the move reproducible
+    if not geo.full_mask & ~(mine | theirs):
+        return None
+    for i in iter_bits(geo.full_mask & ~(mine | theirs)):
+        if geo.wins_through(mine | (1 << i), i):
+            return i
+    workers = workers or os.cpu_count() or 1
+    if playouts is not None:
+        playouts = max(1, playouts // workers)
+    args = (geo.size, geo.win_length, mine, theirs, playouts, time_budget_ms)
+    rng = random.Random(seed)
+    if workers == 1:
+        results = [run_tree(*args, rng.randrange(1 << 30), cancel_event=cancel_event, dimensions=geo.dimensions)]
+    else:
+        # Worker processes cannot see cancel_event; they stop at the time budget
+        pool = _get_pool(workers)
+        futures = [pool.submit(run_tree, *args, rng.randrange(1 << 30), dimensions=geo.dimensions) for _ in range(workers)]
+        results = [future.result() for future in futures]
+    visits = {}
+    for tree in results:
+        for move, count in tree.items():
+            visits[move] = visits.get(move, 0) + count
+    if stats is not None:
+        stats.nodes += sum(visits.values())
+    return max(visits, key=visits.get)
@@ -0,0 +1,330 @@
+import time
+
+from bitboard import iter_bits
+from search import EXACT, LOWER, UPPER, WIN, SearchTimeout, _score_from_table, _score_to_table
+
+# Search for 3D boards such as Qubic, the 4x4x4 cube with 76 lines. Each side's
+# stones are one bitboard, and the stone count of every line is updated move
+# by move together with two line sets per side: threats (one stone short,
+# nothing of the other side's) and builds (two short). A threat's empty cell
+# must be answered at once, so forcing sequences are searched on their own:
+# threat-space search tries only moves that make a threat, answers each with
+# the forced block, and succeeds once the attacker holds two threats at once.
+# Scores are from the point of view of the side to move (negamax), as in search.py.
+VCF_WIN = WIN - 100  # Forced win found by threat-space search at a leaf; length unknown
+LEAF_VCF_DEPTH = 3
+ROOT_VCF_DEPTH = 24
+
+
+class QubicSearch:
+    def __init__(self, geometry, time_budget_ms=1000, max_depth=None, stats=None, cancel_event=None):
+        self.geometry = geometry
+        self.time_budget_ms = time_budget_ms
+        self.max_depth = max_depth if max_depth is not None else geometry.cells
+        self.stats = stats  # Optional SearchStats, updated in place
+        self.cancel_event = cancel_event  # Setting it ends the search like a timeout
+        k = geometry.win_length
+        self.line_masks = geometry.win_masks
+        line_index = {mask: n for n, mask in enumerate(geometry.win_masks)}
+        self.lines_through = tuple(
+            tuple(line_index[mask] for mask in masks) for masks in geometry.masks_through
+        )
+        # Static move order: cells on the most lines first
+        self.cell_order = tuple(sorted(geometry.move_order, key=lambda i: -len(self.lines_through[i])))
+        # value[a * (k + 1) + b] scores a line holding a stones of side 0 and b of side 1
+        weights = [0] + [10 ** (n - 1) for n in range(1, k + 1)]
+        self.stride = k + 1
+        self.value = [
+            weights[a] if not b else -weights[b] if not a else 0
+            for a in range(k + 1) for b in range(k + 1)
+        ]
+        self.table = {}
+        self.vcf_table = {}
+        self.deadline = 0.0
+        self.nodes = 0
+        self._reset(0, 0)
+
+    def _reset(self, mine, theirs):
+        # Side 0 is the side to move at the root
+        k = self.geometry.win_length
+        self.bits = [mine, theirs]
+        self.counts = [bytearray(len(self.line_masks)), bytearray(len(self.line_masks))]
+        self.threats = [0, 0]  # Line sets as bitmasks over line numbers
+        self.builds = [0, 0]
+        self.score = 0  # Side 0's view
+        self.history = []
+        for n, mask in enumerate(self.line_masks):
+            a = bin(mine & mask).count("1")
+            b = bin(theirs & mask).count("1")
+            self.counts[0][n] = a
+            self.counts[1][n] = b
+            self.score += self.value[a * self.stride + b]
+            for side, own, other in ((0, a, b), (1, b, a)):
+                if not other and own == k - 1:
+                    self.threats[side] |= 1 << n
+                elif not other and own == k - 2:
+                    self.builds[side] |= 1 << n
+
+    def search(self, mine, theirs):
+        # Returns (score, move) for the side owning `mine`; move is a cell index
+        geo = self.geometry
+        self.table = {}
+        self.vcf_table = {}
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        self._reset(mine, theirs)
+        empty = geo.full_mask & ~(mine | theirs)
+        if not empty:
+            return 0, None
+        # Immediate win, forced block, then a forcing sequence of our own
+        cells = self._threat_cells(0)
+        if cells:
+            return WIN - 1, _low_cell(cells)
+        cells = self._threat_cells(1)
+        if cells & (cells - 1):
+            return -WIN + 2, _low_cell(cells)
+        best_score, best_move = 0, _low_cell(cells) if cells else self._ordered(0, empty, None, 2)[0]
+        if cells:
+            # The block is the only move; deeper search would only tell us how bad it is
+            self._finish()
+            return best_score, best_move
+        try:
+            for depth in range(2, min(bin(empty).count("1"), ROOT_VCF_DEPTH) + 1, 2):
+                if not self.builds[0]:
+                    break
+                move = self._vcf(0, 1, depth)
+                if move is not None:
+                    self._finish()
+                    return VCF_WIN, move
+            for depth in range(1, self.max_depth + 1):
+                score, move = self._negamax(0, 1, depth, 0, -WIN - 1, WIN + 1)
+                if move is not None:
+                    best_score, best_move = score, move
+                if abs(best_score) >= WIN - self.max_depth or depth >= bin(empty).count("1"):
+                    break
+        except SearchTimeout:
+            pass
+        self._finish()
+        return best_score, best_move
+
+    def _finish(self):
+        if self.stats is not None:
+            self.stats.nodes += self.nodes
+        self._reset(0, 0)
+
+    def _tick(self):
+        self.nodes += 1
+        if not self.nodes & 511 and (
+            time.perf_counter() > self.deadline
+            or (self.cancel_event is not None and self.cancel_event.is_set())
+        ):
+            raise SearchTimeout()
+
+    def _play(self, side, cell):
+        other = 1 - side
+        k = self.geometry.win_length
+        own = self.counts[side]
+        opp = self.counts[other]
+        threats = self.threats
+        builds = self.builds
+        value = self.value
+        stride = self.stride
+        self.history.append((threats[0], threats[1], builds[0], builds[1], self.score))
+        score = self.score
+        for n in self.lines_through[cell]:
+            a = own[n]
+            b = opp[n]
+            if side:
+                score += value[b * stride + a + 1] - value[b * stride + a]
+            else:
+                score += value[(a + 1) * stride + b] - value[a * stride + b]
+            own[n] = a + 1
+            bit = 1 << n
+            if b:
+                if not a:
+                    # The line is no longer open for the other side
+                    threats[other] &= ~bit
+                    builds[other] &= ~bit
+                continue
+            if a + 1 == k - 1:
+                threats[side] |= bit
+                builds[side] &= ~bit
+            elif a + 1 == k - 2:
+                builds[side] |= bit
+            elif a + 1 == k:
+                threats[side] &= ~bit
+        self.score = score
+        self.bits[side] |= 1 << cell
+
+    def _undo(self, side, cell):
+        own = self.counts[side]
+        for n in self.lines_through[cell]:
+            own[n] -= 1
+        self.bits[side] &= ~(1 << cell)
+        self.threats[0], self.threats[1], self.builds[0], self.builds[1], self.score = self.history.pop()
+
+    def _threat_cells(self, side):
+        # Empty cells that would complete one of side's lines
+        cells = 0
+        occupied = self.bits[0] | self.bits[1]
+        masks = self.line_masks
+        for n in iter_bits(self.threats[side]):
+            cells |= masks[n] & ~occupied
+        return cells
+
+    def _build_cells(self, side):
+        cells = 0
+        occupied = self.bits[0] | self.bits[1]
+        masks = self.line_masks
+        for n in iter_bits(self.builds[side]):
+            cells |= masks[n] & ~occupied
+        return cells
+
+    def _vcf(self, side, other, depth):
+        # A threat move for side that wins by force within depth plies, or None.
+        # Neither side may already have a threat
+        if depth <= 0:
+            return None
+        key = (self.bits[side], self.bits[other])
+        failed = self.vcf_table.get(key)
+        if failed is not None:
+            if failed < 0:
+                return -failed - 1  # Stored win
+            if failed >= depth:
+                return None
+        for cell in iter_bits(self._build_cells(side)):
+            self._tick()
+            self._play(side, cell)
+            won = self._after_threat(side, other, depth - 1)
+            self._undo(side, cell)
+            if won:
+                self.vcf_table[key] = -cell - 1
+                return cell
+        self.vcf_table[key] = depth
+        return None
+
+    def _after_threat(self, side, other, depth):
+        # side has just moved and other must answer
+        cells = self._threat_cells(side)
+        if not cells:
+            return False
+        if cells & (cells - 1):
+            return True  # Two threats: only one can be blocked
+        if depth <= 0:
+            return False
+        block = _low_cell(cells)
+        self._play(other, block)
+        try:
+            counter = self._threat_cells(other)
+            if not counter:
+                return self._vcf(side, other, depth - 1) is not None
+            if counter & (counter - 1):
+                return False
+            # The block made a threat of its own; side must answer it, and the
+            # sequence goes on only if that answer threatens again
+            answer = _low_cell(counter)
+            self._play(side, answer)
+            try:
+                return self._after_threat(side, other, depth - 2)
+            finally:
+                self._undo(side, answer)
+        finally:
+            self._undo(other, block)
+
+    def _ordered(self, side, empty, first, depth):
+        # Hash move, then threat-making moves, then cells on the most lines
+        builds = self._build_cells(side) & empty
+        moves = [first] if first is not None else []
+        moves += [i for i in iter_bits(builds) if i != first]
+        if depth >= 2:
+            # Near the root the open lines through each cell are worth counting
+            counts = self.counts
+            own, opp = counts[side], counts[1 - side]
+            rest = []
+            for i in self.cell_order:
+                if empty >> i & 1 and not builds >> i & 1 and i != first:
+                    weight = 0
+                    for n in self.lines_through[i]:
+                        if not opp[n]:
+                            weight += 1 + own[n]
+                        if not own[n]:
+                            weight += 1 + opp[n]
+                    rest.append((-weight, i))
+            rest.sort()
+            moves += [i for _, i in rest]
+        else:
+            moves += [i for i in self.cell_order if empty >> i & 1 and not builds >> i & 1 and i != first]
+        return moves
+
+    def _negamax(self, side, other, depth, ply, alpha, beta):
+        self._tick()
+        if self.threats[side]:
+            return WIN - ply - 1, _low_cell(self._threat_cells(side))
+        empty = self.geometry.full_mask & ~(self.bits[0] | self.bits[1])
+        if not empty:
+            return 0, None
+        forced = self._threat_cells(other)
+        if forced & (forced - 1):
+            return -(WIN - ply - 2), _low_cell(forced)
+        if depth <= 0:
+            if not forced and self.builds[side] and self._vcf(side, other, LEAF_VCF_DEPTH) is not None:
+                return VCF_WIN - ply, None
+            return (self.score if side == 0 else -self.score), None
+
+        alpha_orig, beta_orig = alpha, beta
+        key = (self.bits[side], self.bits[other])
+        entry = self.table.get(key)
+        stats = self.stats
+        if stats is not None:
+            if ply > stats.max_depth:
+                stats.max_depth = ply
+            if entry is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        first = None
+        if entry is not None:
+            entry_depth, score, flag, move = entry
+            first = move
+            if entry_depth >= depth:
+                score = _score_from_table(score, ply)
+                if flag == EXACT:
+                    return score, move
+                elif flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score, move
+
+        # A threat against us leaves one legal reply
+        moves = [_low_cell(forced)] if forced else self._ordered(side, empty, first, depth)
+        best_score = -WIN - 1
+        best_move = None
+        for i in moves:
+            self._play(side, i)
+            try:
+                score, _ = self._negamax(other, side, depth - (0 if forced else 1), ply + 1, -beta, -alpha)
+            finally:
+                self._undo(side, i)
+            score = -score
+            if score > best_score:
+                best_score = score
+                best_move = i
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (depth, _score_to_table(best_score, ply), flag, best_move)
+        return best_score, best_move
+
+
+def _low_cell(cells):
+    return (cells & -cells).bit_length() - 1
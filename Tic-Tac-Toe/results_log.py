@@ -0,0 +1,126 @@
+import collections
+import csv
+import json
+import os
+import time
+
+# Append-only game-result log, one JSON object per line. Results are buffered
+# and written in batches; the file is fsynced at most every fsync_interval
+# seconds and rotated to path.1 .. path.N once it passes max_bytes.
+FIELDS = ["Time", "Winner", "Difficulty"]
+LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.log")
+
+
+class ResultLog:
+    def __init__(self, path=LOG_PATH, recent_size=100, batch_size=16, fsync_interval=5.0,
+                 max_bytes=1 << 20, backups=5):
+        self.path = path
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.pending = []
+        self.file = None
+        self.last_fsync = time.monotonic()
+        self.unsynced = False
+        # Only the latest results stay in memory, for display
+        self.recent = collections.deque(maxlen=recent_size)
+        for path in reversed(self.paths()):
+            missing = recent_size - len(self.recent)
+            if missing <= 0:
+                break
+            self.recent.extendleft(reversed(list(self._read(path))[-missing:]))
+
+    def __len__(self):
+        return len(self.recent)
+
+    def append(self, result):
+        self.recent.append(result)
+        self.pending.append(json.dumps(result) + "\n")
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self, sync=False):
+        # Writes pending results; call periodically so a quiet log still reaches disk
+        if self.pending:
+            if self.file is None:
+                self.file = self._open()
+            self.file.write("".join(self.pending))
+            self.file.flush()
+            self.pending.clear()
+            self.unsynced = True
+        if self.unsynced and (sync or time.monotonic() - self.last_fsync >= self.fsync_interval):
+            os.fsync(self.file.fileno())
+            self.last_fsync = time.monotonic()
+            self.unsynced = False
+        if self.file is not None and self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        if self.file is not None:
+            if self.unsynced:
+                os.fsync(self.file.fileno())
+                self.unsynced = False
+            self.file.close()
+            self.file = None
+        if not os.path.exists(self.path):
+            return
+        for n in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{n}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{n + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def paths(self):
+        # Every file still on disk, oldest first
+        backups = [f"{self.path}.{n}" for n in range(self.backups, 0, -1)]
+        return [path for path in backups + [self.path] if os.path.exists(path)]
+
+    def iter_results(self):
+        self.flush()
+        for path in self.paths():
+            yield from self._read(path)
+
+    def export_csv(self, file_path):
+        # Streams from disk, so the export never holds the whole history in memory
+        count = 0
+        with open(file_path, mode="w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            for row in self.iter_results():
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def close(self):
+        self.flush(sync=True)
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def _open(self):
+        file = open(self.path, "a", encoding="utf-8")
+        # Start on a fresh line if a crash left the last record cut short
+        if file.tell():
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    file.write("\n")
+        return file
+
+    @staticmethod
+    def _read(path):
+        try:
+            f = open(path, encoding="utf-8")
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
@@ -0,0 +1,204 @@
+import time
+
+from bitboard import iter_bits
+
+# Iterative-deepening alpha-beta for boards too large to solve exactly.
+# Scores are from the point of view of the side to move (negamax).
+WIN = 1000000
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class DeepeningSearch:
+    def __init__(self, geometry, time_budget_ms=1000, max_depth=None, stats=None, cancel_event=None):
+        self.geometry = geometry
+        self.time_budget_ms = time_budget_ms
+        self.max_depth = max_depth if max_depth is not None else geometry.cells
+        # Heuristic weight of a line holding n stones of one player and none of the other
+        self.line_weights = [0] + [10 ** (n - 1) for n in range(1, geometry.win_length + 1)]
+        self.table = {}
+        self.deadline = 0.0
+        self.nodes = 0
+        self.stats = stats  # Optional SearchStats, updated in place
+        self.cancel_event = cancel_event  # Setting it ends the search like a timeout
+
+    def search(self, mine, theirs):
+        # Returns (score, move) for the side owning `mine`; move is a cell index
+        geo = self.geometry
+        self.table = {}
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        empty = geo.full_mask & ~(mine | theirs)
+        if not empty:
+            return 0, None
+        # Something legal to return even if the first iteration is cut short
+        best_score, best_move = 0, self._candidates(mine, theirs, empty, None)[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._negamax(mine, theirs, depth, 0, -WIN - 1, WIN + 1)
+            except SearchTimeout:
+                break
+            if move is not None:
+                best_score, best_move = score, move
+            # A forced result is already found; deeper iterations cannot change it
+            if abs(best_score) >= WIN - self.max_depth or depth >= bin(empty).count("1"):
+                break
+        if self.stats is not None:
+            self.stats.nodes += self.nodes
+        return best_score, best_move
+
+    def score_moves(self, mine, theirs):
+        # Scores every empty cell for the side owning `mine`, each with a full window
+        # so sibling scores are comparable. One table serves all siblings and every
+        # iteration. Returns ({cell: score}, deepest completed depth)
+        geo = self.geometry
+        self.table = {}
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        empty = geo.full_mask & ~(mine | theirs)
+        scores = {}
+        completed = 0
+        for depth in range(1, min(self.max_depth, bin(empty).count("1")) + 1):
+            current = {}
+            try:
+                for i in iter_bits(empty):
+                    bit = 1 << i
+                    if geo.wins_through(mine | bit, i):
+                        current[i] = WIN - 1
+                    else:
+                        score, _ = self._negamax(theirs, mine | bit, depth - 1, 1, -WIN - 1, WIN + 1)
+                        current[i] = -score
+            except SearchTimeout:
+                if not scores:
+                    scores = current  # Better a partial first pass than nothing
+                break
+            scores = current
+            completed = depth
+            if all(abs(score) >= WIN - self.max_depth for score in scores.values()):
+                break
+        if self.stats is not None:
+            self.stats.nodes += self.nodes
+        return scores, completed
+
+    def evaluate(self, mine, theirs):
+        score = 0
+        weights = self.line_weights
+        for mask in self.geometry.win_masks:
+            a = mine & mask
+            b = theirs & mask
+            if a and not b:
+                score += weights[bin(a).count("1")]
+            elif b and not a:
+                score -= weights[bin(b).count("1")]
+        return score
+
+    def _candidates(self, mine, theirs, empty, first):
+        geo = self.geometry
+        occupied = mine | theirs
+        near = geo.neighbours(occupied) & empty if occupied else empty
+        wins = []
+        blocks = []
+        rest = []
+        for i in geo.move_order:
+            bit = 1 << i
+            if not near & bit:
+                continue
+            if geo.wins_through(mine | bit, i):
+                wins.append(i)
+            elif geo.wins_through(theirs | bit, i):
+                blocks.append(i)
+            elif i == first:
+                rest.insert(0, i)
+            else:
+                rest.append(i)
+        return wins + blocks + rest
+
+    def _negamax(self, mine, theirs, depth, ply, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 255 and (
+            time.perf_counter() > self.deadline
+            or (self.cancel_event is not None and self.cancel_event.is_set())
+        ):
+            raise SearchTimeout()
+        geo = self.geometry
+        empty = geo.full_mask & ~(mine | theirs)
+        if not empty:
+            return 0, None
+        if depth == 0:
+            return self.evaluate(mine, theirs), None
+
+        alpha_orig, beta_orig = alpha, beta
+        key = (mine, theirs)
+        entry = self.table.get(key)
+        stats = self.stats
+        if stats is not None:
+            if ply > stats.max_depth:
+                stats.max_depth = ply
+            if entry is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        first = None
+        if entry is not None:
+            entry_depth, score, flag, move = entry
+            first = move
+            if entry_depth >= depth:
+                score = _score_from_table(score, ply)
+                if flag == EXACT:
+                    return score, move
+                elif flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score, move
+
+        best_score = -WIN - 1
+        best_move = None
+        for i in self._candidates(mine, theirs, empty, first):
+            bit = 1 << i
+            if geo.wins_through(mine | bit, i):
+                # Nothing beats an immediate win
+                best_score = WIN - ply - 1
+                best_move = i
+                break
+            score, _ = self._negamax(theirs, mine | bit, depth - 1, ply + 1, -beta, -alpha)
+            score = -score
+            if score > best_score:
+                best_score = score
+                best_move = i
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (depth, _score_to_table(best_score, ply), flag, best_move)
+        return best_score, best_move
+
+
+def _score_to_table(score, ply):
+    # Win scores are stored relative to the cached position rather than the root
+    if score > WIN // 2:
+        return score + ply
+    if score < -WIN // 2:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score > WIN // 2:
+        return score - ply
+    if score < -WIN // 2:
+        return score + ply
+    return score
@@ -0,0 +1,322 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import default_win_length
+from engine import DIFFICULTIES, TicTacToe
+from game_records import GameRecordWriter, record_from_game
+
+# One process hosts every game. The protocol is one JSON object per line.
+#   client -> server: {"type": "play", "opponent": "human" | "ai", "size": 3, "win_length": 3,
+#                      "difficulty": "Unbeatable", "side": "X"}
+#                     {"type": "move", "row": 0, "col": 2}
+#                     {"type": "leave"}
+#   server -> client: {"type": "waiting"}
+#                     {"type": "start", "game": 1, "you": "X", "opponent": "ai", "size": 3, "win_length": 3}
+#                     {"type": "move", "player": "X", "row": 0, "col": 2, "turn": "O" | null}
+#                     {"type": "over", "winner": "X" | null, "cells": [[0, 0], ...], "reason": "..."}
+#                     {"type": "error", "message": "..."}
+# After "over" the same connection may send "play" again. An AI move that fails
+# sends "error" and then "over" with no winner, and that game is not recorded.
+MAX_LINE = 4096
+MAX_BUFFER = 1 << 20  # Unsent bytes before a client that stopped reading is dropped
+MIN_SIZE = 3
+MAX_SIZE = 8
+
+
+def _is_int(value):
+    # JSON true and false arrive as bool, which is an int subclass
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _ai_move(size, win_length, difficulty, time_budget_ms, x, o, player):
+    # Runs in an executor process, so it only takes and returns plain values
+    game = TicTacToe(ai_player=player, size=size, win_length=win_length, time_budget_ms=time_budget_ms,
+                     difficulty=difficulty, mcts_workers=1)
+    game.set_position(x, o)
+    return game.choose_move(player)
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.session = None
+        self.symbol = None
+        self.waiting_key = None
+
+    def send(self, message):
+        # Never waits, so game state and its messages change together; the
+        # reader loop drains each client's own buffer after every request
+        if self.writer.is_closing():
+            return
+        self.writer.write((json.dumps(message) + "\n").encode())
+        if self.writer.transport.get_write_buffer_size() > MAX_BUFFER:
+            self.writer.close()
+
+    async def drain(self):
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+
+class Session:
+    def __init__(self, game_id, game, players):
+        self.game_id = game_id
+        self.game = game
+        self.players = players  # {"X": Connection or None, "O": ...}; None is the AI
+        self.over = False
+        self.ai_task = None
+
+    def connections(self):
+        return [conn for conn in self.players.values() if conn is not None]
+
+    def broadcast(self, message):
+        for conn in self.connections():
+            conn.send(message)
+
+
+class GameServer:
+    def __init__(self, ai_workers=None, ai_queue=None, time_budget_ms=200, record_path=None):
+        self.ai_workers = ai_workers or os.cpu_count() or 1
+        # AI jobs beyond this many wait in the event loop, where abandoned games can drop out
+        self.ai_queue = ai_queue or 4 * self.ai_workers
+        self.time_budget_ms = time_budget_ms
+        self.executor = None
+        self.ai_slots = None
+        self.waiting = {}  # (size, win_length) -> Connection waiting for an opponent
+        self.sessions = {}
+        self.game_ids = itertools.count(1)
+        self.games_finished = 0
+        self.records = GameRecordWriter(record_path) if record_path else None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self.executor = ProcessPoolExecutor(max_workers=self.ai_workers)
+        self.ai_slots = asyncio.Semaphore(self.ai_queue)
+        return await asyncio.start_server(self.handle_connection, host, port, limit=MAX_LINE)
+
+    def close(self):
+        for session in list(self.sessions.values()):
+            if session.ai_task is not None:
+                session.ai_task.cancel()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.records is not None:
+            self.records.close()
+
+    async def handle_connection(self, reader, writer):
+        conn = Connection(reader, writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    # Line longer than MAX_LINE, or the peer reset the connection
+                    break
+                if not line:
+                    break
+                try:
+                    self.dispatch(conn, line)
+                except ProtocolError as e:
+                    conn.send({"type": "error", "message": str(e)})
+                await conn.drain()
+        finally:
+            self.leave(conn, "opponent left")
+            writer.close()
+
+    def dispatch(self, conn, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            raise ProtocolError("invalid JSON")
+        if not isinstance(message, dict):
+            raise ProtocolError("expected a JSON object")
+        kind = message.get("type")
+        if kind == "play":
+            self.play(conn, message)
+        elif kind == "move":
+            self.move(conn, message)
+        elif kind == "leave":
+            self.leave(conn, "opponent left")
+        else:
+            raise ProtocolError(f"unknown message type {kind!r}")
+
+    def play(self, conn, message):
+        if conn.session is not None or conn.waiting_key is not None:
+            raise ProtocolError("already in a game")
+        size = message.get("size", 3)
+        if not _is_int(size) or not MIN_SIZE <= size <= MAX_SIZE:
+            raise ProtocolError(f"size must be between {MIN_SIZE} and {MAX_SIZE}")
+        win_length = message.get("win_length")
+        if win_length is not None and (not _is_int(win_length) or not 3 <= win_length <= size):
+            raise ProtocolError("win_length must be between 3 and size")
+        opponent = message.get("opponent", "ai")
+        if opponent == "ai":
+            difficulty = message.get("difficulty", "Unbeatable")
+            if difficulty not in DIFFICULTIES:
+                raise ProtocolError(f"difficulty must be one of {', '.join(DIFFICULTIES)}")
+            side = message.get("side", "X")
+            if side not in ("X", "O"):
+                raise ProtocolError("side must be X or O")
+            ai = "O" if side == "X" else "X"
+            game = TicTacToe(ai_player=ai, human_player=side, size=size, win_length=win_length,
+                             time_budget_ms=self.time_budget_ms, difficulty=difficulty)
+            self.start_session(game, {side: conn, ai: None})
+        elif opponent == "human":
+            key = (size, win_length or default_win_length(size))
+            other = self.waiting.pop(key, None)
+            if other is None:
+                self.waiting[key] = conn
+                conn.waiting_key = key
+                conn.send({"type": "waiting"})
+                return
+            other.waiting_key = None
+            # Whoever waited longer moves first
+            self.start_session(TicTacToe(size=size, win_length=key[1]), {"X": other, "O": conn})
+        else:
+            raise ProtocolError("opponent must be human or ai")
+
+    def start_session(self, game, players):
+        session = Session(next(self.game_ids), game, players)
+        self.sessions[session.game_id] = session
+        for symbol, conn in players.items():
+            if conn is not None:
+                conn.session = session
+                conn.symbol = symbol
+        opponent = "ai" if None in players.values() else "human"
+        for symbol, conn in players.items():
+            if conn is not None:
+                conn.send({
+                    "type": "start", "game": session.game_id, "you": symbol, "opponent": opponent,
+                    "size": game.size, "win_length": game.win_length,
+                })
+        self.schedule_ai(session)
+
+    def schedule_ai(self, session):
+        game = session.game
+        if not session.over and game.current_player == game.ai_player:
+            session.ai_task = asyncio.create_task(self.ai_turn(session))
+
+    async def ai_turn(self, session):
+        game = session.game
+        async with self.ai_slots:
+            if session.over:
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                move = await loop.run_in_executor(
+                    self.executor, _ai_move, game.size, game.win_length, game.difficulty, game.time_budget_ms,
+                    game.board.x, game.board.o, game.ai_player,
+                )
+            except Exception:
+                # A crashed or broken worker pool; end the game rather than leave the client waiting
+                session.ai_task = None
+                if not session.over:
+                    session.broadcast({"type": "error", "message": "AI move failed"})
+                    self.finish(session, None, [], "AI move failed", record=False)
+                return
+        session.ai_task = None
+        if not session.over and move is not None:
+            self.apply_move(session, move[0], move[1])
+
+    def move(self, conn, message):
+        session = conn.session
+        if session is None:
+            raise ProtocolError("not in a game")
+        game = session.game
+        if game.current_player != conn.symbol:
+            raise ProtocolError("not your turn")
+        row = message.get("row")
+        col = message.get("col")
+        if not _is_int(row) or not _is_int(col) or not (0 <= row < game.size and 0 <= col < game.size):
+            raise ProtocolError(f"row and col must be between 0 and {game.size - 1}")
+        if not game.is_valid_move(row, col):
+            raise ProtocolError("cell is taken")
+        self.apply_move(session, row, col)
+
+    def apply_move(self, session, row, col):
+        game = session.game
+        player = game.current_player
+        game.make_move(row, col, player)
+        winner = game.check_winner()
+        ended = bool(winner) or game.is_draw()
+        # turn is null once the game is over, so clients never answer a final move
+        session.broadcast({
+            "type": "move", "player": player, "row": row, "col": col,
+            "turn": None if ended else game.current_player,
+        })
+        if ended:
+            self.finish(session, winner, [list(cell) for cell in game.winning_cells])
+        else:
+            self.schedule_ai(session)
+
+    def finish(self, session, winner, cells, reason=None, notify=None, record=True):
+        session.over = True
+        self.sessions.pop(session.game_id, None)
+        self.games_finished += 1
+        if record and self.records is not None:
+            # Forfeits are stored with the winner by forfeit and the moves played so far
+            self.records.write(record_from_game(session.game)._replace(winner=winner))
+        message = {"type": "over", "winner": winner, "cells": cells}
+        if reason is not None:
+            message["reason"] = reason
+        connections = session.connections()
+        for conn in connections:
+            conn.session = None
+            conn.symbol = None
+        for conn in connections if notify is None else notify:
+            conn.send(message)
+
+    def leave(self, conn, reason):
+        if conn.waiting_key is not None:
+            if self.waiting.get(conn.waiting_key) is conn:
+                del self.waiting[conn.waiting_key]
+            conn.waiting_key = None
+        session = conn.session
+        if session is None:
+            return
+        if session.ai_task is not None:
+            session.ai_task.cancel()
+        # The remaining side wins by forfeit
+        winner = "O" if conn.symbol == "X" else "X"
+        others = [other for other in session.connections() if other is not conn]
+        self.finish(session, winner, [], reason, notify=others)
+
+
+async def serve(host, port, ai_workers, ai_queue, time_budget_ms, record_path):
+    server = GameServer(ai_workers, ai_queue, time_budget_ms, record_path)
+    listener = await server.start(host, port)
+    address = ", ".join(str(sock.getsockname()) for sock in listener.sockets)
+    print(f"Serving Tic-Tac-Toe on {address} with {server.ai_workers} AI workers")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host many Tic-Tac-Toe games over line-delimited JSON on TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ai-workers", type=int, default=None, help="processes for AI moves (default: every core)")
+    parser.add_argument("--ai-queue", type=int, default=None, help="AI moves in flight at once (default: 4 per worker)")
+    parser.add_argument("--time-budget-ms", type=int, default=200, help="AI time limit per move on large boards")
+    parser.add_argument("--record", metavar="PATH", help="append every finished game to this binary record file")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.ai_workers, args.ai_queue, args.time_budget_ms, args.record))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import argparse
+import time
+
+import numpy as np
+
+from batch import EMPTY, O, X, line_hits, line_matrix
+from bitboard import geometry
+
+# Headless self-play: a whole batch of games advances one ply at a time as an
+# (N, cells) int8 array, 0 = empty, 1 = X, 2 = O.
+STRATEGIES = {}
+
+
+def strategy(name):
+    def register(func):
+        STRATEGIES[name] = func
+        return func
+    return register
+
+
+@strategy("random")
+def random_policy(sim, boards, player):
+    # The "Easy" AI: uniform over legal moves
+    scores = sim.rng.random(boards.shape)
+    scores[boards != EMPTY] = -1.0
+    return scores.argmax(axis=1)
+
+
+@strategy("minimax")
+def minimax_policy(sim, boards, player):
+    # The "Unbeatable" AI; on 3x3 this is one gather from the perfect-play table
+    if sim.geometry.is_classic():
+        return sim.perfect_moves()[boards.astype(np.int64) @ sim.pow3]
+    return per_board_policy(sim, boards, player, "Unbeatable")
+
+
+@strategy("mcts")
+def mcts_policy(sim, boards, player):
+    return per_board_policy(sim, boards, player, "Monte Carlo")
+
+
+def per_board_policy(sim, boards, player, difficulty):
+    # Fallback for engines without a vectorised form: one TicTacToe call per board
+    from engine import TicTacToe
+
+    geo = sim.geometry
+    game = TicTacToe(size=geo.size, win_length=geo.win_length, difficulty=difficulty,
+                     time_budget_ms=sim.time_budget_ms, mcts_workers=1)
+    symbol = "X" if player == X else "O"
+    moves = np.empty(len(boards), dtype=np.int64)
+    for n, cells in enumerate(boards):
+        game.set_position(_bits(cells, X), _bits(cells, O))
+        row, col = game.choose_move(symbol)
+        moves[n] = row * geo.size + col
+    return moves
+
+
+def _bits(cells, player):
+    mask = 0
+    for i in np.flatnonzero(cells == player):
+        mask |= 1 << int(i)
+    return mask
+
+
+class BatchSimulator:
+    def __init__(self, x_strategy, o_strategy, size=3, win_length=None, seed=None, time_budget_ms=100):
+        self.geometry = geometry(size, win_length)
+        self.strategies = {X: STRATEGIES[x_strategy], O: STRATEGIES[o_strategy]}
+        self.rng = np.random.default_rng(seed)
+        self.time_budget_ms = time_budget_ms
+        self.lines = line_matrix(self.geometry.size, self.geometry.win_length)
+        self.pow3 = 3 ** np.arange(self.geometry.cells, dtype=np.int64)
+        self._perfect_moves = None
+
+    def perfect_moves(self):
+        # Best move for every base-3 position index, from the mmap'd table if present
+        if self._perfect_moves is None:
+            from lookup_table import HEADER, load_table, solve_entries
+            from engine import WIN_SCORE
+
+            table = load_table(WIN_SCORE)
+            if table is not None:
+                entries = np.frombuffer(table.data, dtype=np.uint8, offset=HEADER.size)
+            else:
+                entries = np.frombuffer(bytes(solve_entries()[0]), dtype=np.uint8)
+            self._perfect_moves = entries[0::2].astype(np.int64)
+        return self._perfect_moves
+
+    def play_batch(self, count):
+        # Returns the winner of each game: 0 for a draw, else X or O
+        boards = np.zeros((count, self.geometry.cells), dtype=np.int8)
+        winners = np.zeros(count, dtype=np.int8)
+        active = np.arange(count)
+        for ply in range(self.geometry.cells):
+            player = X if ply % 2 == 0 else O
+            current = boards[active]
+            moves = self.strategies[player](self, current, player)
+            current[np.arange(len(active)), moves] = player
+            boards[active] = current
+            won = line_hits(current, self.lines, player).any(axis=1)
+            winners[active[won]] = player
+            active = active[~won]
+            if not len(active):
+                break
+        return winners
+
+    def run(self, games, batch_size=100000):
+        counts = {X: 0, O: 0, EMPTY: 0}
+        remaining = games
+        while remaining > 0:
+            winners = self.play_batch(min(batch_size, remaining))
+            for result, total in zip(*np.unique(winners, return_counts=True)):
+                counts[int(result)] += int(total)
+            remaining -= len(winners)
+        return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many headless games between two strategies.")
+    parser.add_argument("--x", default="random", choices=sorted(STRATEGIES), help="strategy playing X")
+    parser.add_argument("--o", default="minimax", choices=sorted(STRATEGIES), help="strategy playing O")
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--batch-size", type=int, default=100000)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--time-budget-ms", type=int, default=100, help="per move, for non-vectorised engines")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    sim = BatchSimulator(args.x, args.o, args.size, args.win_length, args.seed, args.time_budget_ms)
+    start = time.perf_counter()
+    counts = sim.run(args.games, args.batch_size)
+    elapsed = time.perf_counter() - start
+    for label, key in ((f"X ({args.x}) wins", X), (f"O ({args.o}) wins", O), ("Draws", EMPTY)):
+        print(f"{label}: {counts[key]} ({100.0 * counts[key] / args.games:.2f}%)")
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+from bitboard import CLASSIC, iter_bits
+
+# Immutable position value: both players' cells packed into one integer each,
+# the side to move and the winner. apply returns a new state, so states can be
+# shared between threads and sessions and used as dict keys.
+
+
+class GameState:
+    __slots__ = ("x", "o", "geometry", "to_move", "winner", "win_cell", "_hash")
+
+    def __init__(self, x=0, o=0, geometry=CLASSIC, to_move="X", winner=None, win_cell=None):
+        # Trusts winner and win_cell; use from_bits for a position with unknown history
+        setattr_ = object.__setattr__
+        setattr_(self, "x", x)
+        setattr_(self, "o", o)
+        setattr_(self, "geometry", geometry)
+        setattr_(self, "to_move", to_move)
+        setattr_(self, "winner", winner)
+        setattr_(self, "win_cell", win_cell)  # The move that completed the winning line
+        setattr_(self, "_hash", None)
+
+    @classmethod
+    def from_bits(cls, x, o, geometry=CLASSIC, to_move=None):
+        # Scans every line once; to_move defaults to X when both have moved equally often
+        if to_move is None:
+            to_move = "X" if bin(x).count("1") == bin(o).count("1") else "O"
+        for mask in geometry.win_masks:
+            for player, bits in (("X", x), ("O", o)):
+                if bits & mask == mask:
+                    return cls(x, o, geometry, to_move, player, next(iter_bits(mask)))
+        return cls(x, o, geometry, to_move)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameState is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("GameState is immutable")
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash((self.x, self.o, self.to_move, self.geometry.size,
+                                                    self.geometry.win_length)))
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return (
+            self.x == other.x and self.o == other.o and self.to_move == other.to_move
+            and self.geometry is other.geometry
+        )
+
+    def __repr__(self):
+        return f"GameState(x={self.x:#x}, o={self.o:#x}, size={self.size}, to_move={self.to_move!r})"
+
+    def apply(self, cell, player=None):
+        # New state with player (default: the side to move) on cell; only lines through cell are checked
+        if player is None:
+            player = self.to_move
+        bit = 1 << cell
+        if (self.x | self.o) & bit:
+            raise ValueError(f"Cell {cell} is taken")
+        x, o = (self.x | bit, self.o) if player == "X" else (self.x, self.o | bit)
+        winner, win_cell = self.winner, self.win_cell
+        if winner is None and self.geometry.wins_through(x if player == "X" else o, cell):
+            winner, win_cell = player, cell
+        return GameState(x, o, self.geometry, "O" if player == "X" else "X", winner, win_cell)
+
+    def without(self, cell):
+        # Inverse of apply: clears cell and gives its owner the turn again
+        bit = 1 << cell
+        player = "X" if self.x & bit else "O"
+        winner, win_cell = (None, None) if cell == self.win_cell else (self.winner, self.win_cell)
+        return GameState(self.x & ~bit, self.o & ~bit, self.geometry, player, winner, win_cell)
+
+    def with_turn(self, player):
+        if player == self.to_move:
+            return self
+        return GameState(self.x, self.o, self.geometry, player, self.winner, self.win_cell)
+
+    @property
+    def size(self):
+        return self.geometry.size
+
+    def bits(self, player):
+        return self.x if player == "X" else self.o
+
+    def occupied(self):
+        return self.x | self.o
+
+    def empty_mask(self):
+        return self.geometry.full_mask & ~(self.x | self.o)
+
+    def cell_index(self, row, col):
+        return row * self.geometry.size + col
+
+    def cell_coords(self, index):
+        return divmod(index, self.geometry.size)
+
+    def get(self, row, col):
+        bit = 1 << self.cell_index(row, col)
+        if self.x & bit:
+            return "X"
+        if self.o & bit:
+            return "O"
+        return " "
+
+    def is_empty(self, row, col):
+        return not (self.x | self.o) & (1 << self.cell_index(row, col))
+
+    def is_full(self):
+        return (self.x | self.o) == self.geometry.full_mask
+
+    def is_over(self):
+        return self.winner is not None or self.is_full()
+
+    def winning_mask(self):
+        if self.winner is None:
+            return 0
+        bits = self.bits(self.winner)
+        for mask in self.geometry.masks_through[self.win_cell]:
+            if bits & mask == mask:
+                return mask
+        return 0
+
+    @property
+    def winning_cells(self):
+        # Built only when asked for, from the lines through the winning move
+        return [self.cell_coords(i) for i in iter_bits(self.winning_mask())]
+
+    def available_moves(self):
+        return [self.cell_coords(i) for i in iter_bits(self.empty_mask())]
+
+    def rows(self):
+        # Every row of every layer, so a 3D board has size * size rows
+        size = self.geometry.size
+        return [[self.get(r, c) for c in range(size)] for r in range(self.geometry.rows)]
@@ -0,0 +1,28 @@
+class SearchStats:
+    # Filled in by the engines only when a TicTacToe has stats enabled
+    __slots__ = ("engine", "nodes", "max_depth", "cache_hits", "cache_misses", "wall_time", "move")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.engine = None
+        self.nodes = 0
+        self.max_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.wall_time = 0.0
+        self.move = None
+
+    def nodes_per_second(self):
+        return self.nodes / self.wall_time if self.wall_time else 0.0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __str__(self):
+        return (
+            f"{self.engine}: {self.nodes} nodes, depth {self.max_depth}, "
+            f"cache {self.cache_hits} hits / {self.cache_misses} misses, "
+            f"{self.wall_time * 1000:.2f} ms ({self.nodes_per_second():.0f} nodes/s)"
+        )
@@ -0,0 +1,311 @@
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+
+from bitboard import geometry, iter_bits
+
+# Retrograde tablebase for boards of up to 16 cells (4x4). Positions are
+# solved a layer of stones at a time, from the full board back to the empty
+# one, and only the smallest of the 8 symmetric base-3 indices is solved.
+# Layout: header, then the sorted canonical indices (uint32), then one code
+# byte per index: outcome for the side to move << 5 | plies to the end.
+MAGIC = b"TTTR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHBBII")  # magic, version, size, win length, fingerprint, entry count
+LOSS = 1
+DRAW = 2
+WIN = 3
+OUTCOMES = {LOSS: -1, DRAW: 0, WIN: 1}
+MAX_CELLS = 16  # 3**16 codes are held in one work array while solving
+TABLEBASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_loaded = {}  # (size, win_length, dimensions) -> Tablebase or None
+
+
+def tablebase_path(size, win_length):
+    return os.path.join(TABLEBASE_DIR, f"tablebase_{size}x{size}_{win_length}.bin")
+
+
+def fingerprint(geo):
+    return zlib.crc32(repr((FORMAT_VERSION, geo.size, geo.win_length, geo.win_masks)).encode())
+
+
+def symmetries(size):
+    # perms[s][i] is the cell that cell i lands on under symmetry s
+    perms = []
+    for transpose in (False, True):
+        for flip_rows in (False, True):
+            for flip_cols in (False, True):
+                perm = []
+                for i in range(size * size):
+                    r, c = divmod(i, size)
+                    if transpose:
+                        r, c = c, r
+                    if flip_rows:
+                        r = size - 1 - r
+                    if flip_cols:
+                        c = size - 1 - c
+                    perm.append(r * size + c)
+                perms.append(perm)
+    return perms
+
+
+class Tablebase:
+    def __init__(self, file, data, geo, count):
+        self.file = file
+        self.data = data
+        self.geometry = geo
+        self.count = count
+        self.keys = memoryview(data)[HEADER.size:HEADER.size + 4 * count].cast("I")
+        self.codes_offset = HEADER.size + 4 * count
+        # Base-3 digits and symmetric images of each byte of a bitmask
+        self.digits = [
+            [sum(3 ** (i + 8 * half) for i in iter_bits(byte)) for byte in range(256)] for half in (0, 1)
+        ]
+        self.images = [
+            [
+                [sum(1 << perm[i + 8 * half] for i in iter_bits(byte) if i + 8 * half < geo.cells) for byte in range(256)]
+                for half in (0, 1)
+            ]
+            for perm in symmetries(geo.size)
+        ]
+
+    def index(self, x, o):
+        lo, hi = self.digits
+        return lo[x & 255] + hi[x >> 8] + 2 * (lo[o & 255] + hi[o >> 8])
+
+    def canonical_index(self, x, o):
+        best = None
+        for lo, hi in self.images:
+            index = self.index(lo[x & 255] | hi[x >> 8], lo[o & 255] | hi[o >> 8])
+            if best is None or index < best:
+                best = index
+        return best
+
+    def lookup(self, x, o):
+        # Returns (outcome for the side to move: 1, 0 or -1, plies to the end) or None
+        key = self.canonical_index(x, o)
+        i = bisect.bisect_left(self.keys, key)
+        if i == self.count or self.keys[i] != key:
+            return None
+        code = self.data[self.codes_offset + i]
+        return OUTCOMES[code >> 5], code & 31
+
+    def move_values(self, mine, theirs, x_to_move):
+        # (cell, outcome, plies to the end) for every move of the side owning mine,
+        # or None if the table is missing a position
+        values = []
+        for cell in iter_bits(self.geometry.full_mask & ~(mine | theirs)):
+            after = mine | (1 << cell)
+            if self.geometry.wins_through(after, cell):
+                values.append((cell, 1, 1))
+                continue
+            entry = self.lookup(after, theirs) if x_to_move else self.lookup(theirs, after)
+            if entry is None:
+                return None
+            # The opponent moves next: their loss is our win
+            values.append((cell, -entry[0], entry[1] + 1))
+        return values
+
+    def best_move(self, mine, theirs, x_to_move):
+        # Returns (cell, outcome, plies to the end) for the side owning mine, or None
+        values = self.move_values(mine, theirs, x_to_move)
+        if not values:
+            return None
+        # Win fast, lose slowly
+        return max(values, key=lambda value: (value[1], value[2] if value[1] < 0 else -value[2]))
+
+    def close(self):
+        self.keys.release()
+        self.data.close()
+        self.file.close()
+
+
+def get_tablebase(geo):
+    # load_tablebase for the default file, once per process
+    key = (geo.size, geo.win_length, geo.dimensions)
+    if key not in _loaded:
+        _loaded[key] = load_tablebase(geo) if geo.dimensions == 2 else None
+    return _loaded[key]
+
+
+def load_tablebase(geo, path=None):
+    # Returns None if the file is missing, truncated or built for another board
+    if geo.cells > MAX_CELLS or sys.byteorder != "little":
+        return None
+    path = path or tablebase_path(geo.size, geo.win_length)
+    try:
+        file = open(path, "rb")
+    except OSError:
+        return None
+    try:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        file.close()
+        return None
+    valid = len(data) >= HEADER.size
+    if valid:
+        magic, version, size, win_length, table_fingerprint, count = HEADER.unpack_from(data)
+        valid = (
+            magic == MAGIC
+            and version == FORMAT_VERSION
+            and (size, win_length) == (geo.size, geo.win_length)
+            and table_fingerprint == fingerprint(geo)
+            and len(data) == HEADER.size + 5 * count
+        )
+    if not valid:
+        data.close()
+        file.close()
+        return None
+    return Tablebase(file, data, geo, count)
+
+
+# Generation below needs NumPy; queries above do not
+
+_work = None  # (codes memmap, geometry, pow3, lines) in each solving process
+
+
+def _open_work(path, size, win_length):
+    global _work
+    import numpy as np
+
+    from batch import line_matrix
+
+    geo = geometry(size, win_length)
+    codes = np.memmap(path, dtype=np.uint8, mode="r+", shape=(3 ** geo.cells,))
+    _work = codes, geo, 3 ** np.arange(geo.cells, dtype=np.int64), line_matrix(size, win_length)
+
+
+def layer_positions(stones, cells, pow3, perms):
+    # Canonical indices of every position with this many stones (X has the extra
+    # one), and the (8, N) indices of their symmetric images
+    import numpy as np
+
+    x_count = (stones + 1) // 2
+    masks = np.arange(1 << cells, dtype=np.int64)
+    bits = (masks[:, None] >> np.arange(cells)) & 1
+    occupied = bits[bits.sum(axis=1) == stones]
+    positions = np.nonzero(occupied)[1].reshape(len(occupied), stones)
+    patterns = (np.arange(1 << stones)[:, None] >> np.arange(stones)) & 1
+    patterns = patterns[patterns.sum(axis=1) == x_count]
+    digits = (2 - patterns).T  # 1 for X, 2 for O
+    images = np.stack([(pow3[np.asarray(perm)[positions]] @ digits).ravel() for perm in perms])
+    canonical = images[0] == images.min(axis=0)
+    return images[0][canonical], images[:, canonical]
+
+
+def solve_chunk(indices, stones):
+    # Codes for one slice of a layer; every position with one more stone is solved
+    import numpy as np
+
+    from batch import EMPTY, O, X, line_hits
+
+    codes, geo, pow3, lines = _work
+    cells = (indices[:, None] // pow3) % 3
+    mover, last = (X, O) if stones % 2 == 0 else (O, X)
+    last_won = line_hits(cells, lines, last).any(axis=1)
+    mover_won = line_hits(cells, lines, mover).any(axis=1)
+    result = np.zeros(len(indices), dtype=np.uint8)
+    # The side to move already having a line cannot happen in play; those stay 0
+    result[last_won & ~mover_won] = LOSS << 5
+    open_ = ~last_won & ~mover_won
+    if stones == geo.cells:
+        result[open_] = DRAW << 5
+        return result
+    empty = cells[open_] == EMPTY
+    children = indices[open_, None] + pow3 * mover
+    child = codes[np.where(empty, children, 0)].astype(np.int16)
+    outcome = child >> 5
+    plies = child & 31
+    # Ordered so the best move has the largest key: fast wins, draws, slow losses
+    keys = np.where(outcome == LOSS, 100 - plies, np.where(outcome == DRAW, 50, plies))
+    best = np.where(empty & (child > 0), keys, -1).max(axis=1)
+    won = best > 50
+    lost = best < 50
+    solved = np.full(len(best), DRAW << 5 | (geo.cells - stones), dtype=np.int16)
+    solved[won] = WIN << 5 | (101 - best[won])
+    solved[lost] = LOSS << 5 | (best[lost] + 1)
+    result[open_] = solved
+    return result
+
+
+def build_tablebase(size=4, win_length=None, path=None, workers=None, progress=None):
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    import numpy as np
+
+    geo = geometry(size, win_length)
+    if geo.cells > MAX_CELLS:
+        raise ValueError(f"Boards above {MAX_CELLS} cells are too large for a tablebase")
+    path = path or tablebase_path(geo.size, geo.win_length)
+    workers = workers or os.cpu_count() or 1
+    pow3 = 3 ** np.arange(geo.cells, dtype=np.int64)
+    perms = symmetries(size)
+    fd, work_path = tempfile.mkstemp(suffix=".codes", dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    keys = []
+    values = []
+    try:
+        np.memmap(work_path, dtype=np.uint8, mode="w+", shape=(3 ** geo.cells,)).flush()
+        _open_work(work_path, size, geo.win_length)
+        codes = _work[0]
+        # Workers see the parent's writes through the shared file mapping
+        pool = ProcessPoolExecutor(workers, initializer=_open_work, initargs=(work_path, size, geo.win_length)) \
+            if workers > 1 else None
+        try:
+            for stones in range(geo.cells, -1, -1):
+                indices, images = layer_positions(stones, geo.cells, pow3, perms)
+                if pool is not None:
+                    chunks = np.array_split(indices, 4 * workers)
+                    layer = np.concatenate(list(pool.map(solve_chunk, chunks, [stones] * len(chunks))))
+                else:
+                    layer = solve_chunk(indices, stones)
+                codes[images.ravel()] = np.tile(layer, len(perms))
+                codes.flush()
+                keep = layer != 0
+                keys.append(indices[keep])
+                values.append(layer[keep])
+                if progress is not None:
+                    progress(stones, int(keep.sum()))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    finally:
+        os.remove(work_path)
+    keys = np.concatenate(keys)
+    values = np.concatenate(values)
+    order = np.argsort(keys)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, geo.size, geo.win_length, fingerprint(geo), len(keys)))
+        f.write(keys[order].astype("<u4").tobytes())
+        f.write(values[order].tobytes())
+    os.replace(tmp_path, path)
+    return len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve every position of a small board into a tablebase file.")
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: every core)")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    def progress(stones, count):
+        print(f"{stones:2} stones: {count} positions")
+
+    start = time.perf_counter()
+    count = build_tablebase(args.size, args.win_length, args.output, args.workers, progress)
+    geo = geometry(args.size, args.win_length)
+    path = args.output or tablebase_path(geo.size, geo.win_length)
+    print(f"Wrote {count} positions to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
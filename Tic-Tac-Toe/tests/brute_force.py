@@ -0,0 +1,77 @@
+import random
+
+from bitboard import iter_bits
+from state import GameState
+
+# A plain, unpruned solver that knows nothing about symmetry, tables or move
+# ordering, for checking the exact answers of the real ones.
+
+
+def solve_moves(geo, mine, theirs, memo):
+    # {cell: (outcome, plies to the end)} for the side owning mine
+    values = {}
+    for cell in iter_bits(geo.full_mask & ~(mine | theirs)):
+        after = mine | (1 << cell)
+        if geo.wins_through(after, cell):
+            values[cell] = 1, 1
+        elif after | theirs == geo.full_mask:
+            values[cell] = 0, 1
+        else:
+            outcome, plies = solve(geo, theirs, after, memo)
+            values[cell] = -outcome, plies + 1
+    return values
+
+
+def solve(geo, mine, theirs, memo):
+    # Perfect-play (outcome, plies) for the side owning mine: fast wins, slow losses
+    key = mine, theirs
+    if key not in memo:
+        values = solve_moves(geo, mine, theirs, memo).values()
+        memo[key] = max(values, key=lambda v: (v[0], -v[1] if v[0] >= 0 else v[1]))
+    return memo[key]
+
+
+def open_positions(geo):
+    # (x, o) of every reachable position that is not over
+    seen = set()
+    found = []
+
+    def walk(x, o):
+        if (x, o) in seen:
+            return
+        seen.add((x, o))
+        found.append((x, o))
+        x_to_move = bin(x).count("1") == bin(o).count("1")
+        for cell in iter_bits(geo.full_mask & ~(x | o)):
+            bit = 1 << cell
+            after = (x | bit, o) if x_to_move else (x, o | bit)
+            if not geo.wins_through(after[0] if x_to_move else after[1], cell) and after[0] | after[1] != geo.full_mask:
+                walk(*after)
+
+    walk(0, 0)
+    return found
+
+
+def random_positions(geo, stones, count, seed):
+    # Positions reached by random play that are still open after `stones` marks
+    rng = random.Random(seed)
+    found = []
+    while len(found) < count:
+        state = GameState(geometry=geo)
+        for cell in rng.sample(range(geo.cells), stones):
+            state = state.apply(cell)
+        if not state.is_over():
+            found.append((state.x, state.o))
+    return found
+
+
+def sides(x, o):
+    # (mine, theirs, player to move)
+    if bin(x).count("1") == bin(o).count("1"):
+        return x, o, "X"
+    return o, x, "O"
+
+
+def expected_score(outcome, plies, win):
+    # The engine's distance-aware score for a brute-force value
+    return {1: win - plies, 0: 0, -1: plies - win}[outcome]
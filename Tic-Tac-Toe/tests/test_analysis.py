@@ -0,0 +1,57 @@
+import pytest
+
+from analysis import analyze, analyze_lines, parse_position
+from bitboard import CLASSIC, geometry
+from brute_force import open_positions, random_positions, sides, solve_moves
+from state import GameState
+from tablebase import get_tablebase
+
+
+def test_analyze_gives_exact_3x3_move_values():
+    memo = {}
+    for x, o in open_positions(CLASSIC):
+        mine, theirs, _ = sides(x, o)
+        expected = solve_moves(CLASSIC, mine, theirs, memo)
+        values = analyze(GameState.from_bits(x, o))
+        assert all(v.exact for v in values)
+        assert {CLASSIC.size * v.row + v.col: (v.outcome, v.plies) for v in values} == expected, (x, o)
+
+
+def test_analyze_is_exact_where_the_4x4_tablebase_covers():
+    geo = geometry(4)
+    if get_tablebase(geo) is None:
+        pytest.skip("tablebase_4x4_4.bin has not been built")
+    for x, o in random_positions(geo, 8, 20, 23):
+        values = analyze(GameState.from_bits(x, o, geo))
+        assert values and all(v.exact for v in values)
+
+
+def test_analyze_searches_other_boards():
+    state = parse_position("X.O../.X.O./..X../...../O.... 4")
+    values = analyze(state, time_budget_ms=200)
+    assert len(values) == 19 and not any(v.exact for v in values)
+    # X completes the diagonal at (3, 3)
+    assert [(v.row, v.col) for v in values if v.outcome == 1 and v.plies == 1] == [(3, 3)]
+    assert analyze(state, exact_only=True) is None
+
+
+def test_positions_parse_with_or_without_slashes():
+    state = parse_position("XO./.X./..O")
+    assert state == parse_position("xo-_x_..o") == GameState.from_bits(0b10001, 0b100000010)
+    assert state.to_move == "X"
+    assert parse_position("..../..../..../.... 3").geometry is geometry(4, 3)
+
+
+@pytest.mark.parametrize("text", ["", "XO", "XXX/.../...", "XO?/.../...", "X../.../... three", "a b c"])
+def test_bad_positions_are_refused(text):
+    with pytest.raises(ValueError):
+        parse_position(text)
+
+
+def test_analyze_lines_reports_each_position():
+    lines = ["# a comment", "", "XXX/OO./...", "XO./.../...", "XO?/.../..."]
+    results = list(analyze_lines(lines))
+    assert [r.get("winner") for r in results] == ["X", None, None]
+    assert results[0]["moves"] == [] and results[0]["to_move"] is None
+    assert results[1]["to_move"] == "X" and len(results[1]["moves"]) == 7
+    assert "error" in results[2]
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import EMPTY, O, X, evaluate_positions, line_matrix
+from bitboard import geometry, iter_bits
+from state import GameState
+
+
+def random_games(geo, count, seed):
+    # States from random play stopped at a random ply, finished games included
+    rng = random.Random(seed)
+    states = []
+    for _ in range(count):
+        state = GameState(geometry=geo)
+        for _ in range(rng.randrange(geo.cells + 1)):
+            if state.is_over():
+                break
+            state = state.apply(rng.choice(list(iter_bits(state.empty_mask()))))
+        states.append(state)
+    return states
+
+
+def as_array(states, geo):
+    cells = np.zeros((len(states), geo.cells), dtype=np.int8)
+    for n, state in enumerate(states):
+        cells[n, list(iter_bits(state.x))] = X
+        cells[n, list(iter_bits(state.o))] = O
+    return cells
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (4, 4), (5, 4)])
+def test_evaluation_matches_game_state(size, win_length):
+    geo = geometry(size, win_length)
+    states = random_games(geo, 300, size)
+    result = evaluate_positions(as_array(states, geo), win_length)
+    lines = line_matrix(size, win_length)
+    codes = {None: EMPTY, "X": X, "O": O}
+    for n, state in enumerate(states):
+        assert result.winners[n] == codes[state.winner]
+        assert result.draws[n] == (state.winner is None and state.is_full())
+        if state.winner is None:
+            assert result.winning_lines[n] == -1
+            assert set(np.flatnonzero(result.legal_moves[n])) == set(iter_bits(state.empty_mask()))
+        else:
+            assert all(state.bits(state.winner) >> int(cell) & 1 for cell in lines[result.winning_lines[n]])
+            assert not result.legal_moves[n].any()
+
+
+def test_boards_as_strings_and_grids():
+    grid = [["X", "O", " "], [" ", "X", "O"], [" ", " ", "X"]]
+    result = evaluate_positions([grid])
+    assert result.winners[0] == X and not result.draws[0]
+
+
+def test_non_square_boards_are_refused():
+    with pytest.raises(ValueError):
+        evaluate_positions(np.zeros((2, 8), dtype=np.int8))
@@ -0,0 +1,70 @@
+import random
+
+import pytest
+
+from engine import TicTacToe
+from game_records import HEADER, GameRecord, GameRecordReader, GameRecordWriter, record_from_game, replay
+
+
+def played_game(size, dimensions, seed):
+    rng = random.Random(seed)
+    game = TicTacToe(ai_player="O", human_player="X", size=size, dimensions=dimensions, difficulty="Easy")
+    while not (game.check_winner() or game.is_draw()):
+        game.make_move(*rng.choice(game.get_available_moves()), game.current_player)
+    return game
+
+
+def test_records_round_trip(tmp_path):
+    path = str(tmp_path / "games.bin")
+    records = [
+        record_from_game(played_game(3, 2, 1), timestamp=1.5),
+        record_from_game(played_game(8, 2, 2), timestamp=2.5),
+        record_from_game(played_game(4, 3, 3), timestamp=3.5),
+        GameRecord(4.5, 3, 3, None, None, "human", "human", (4, 0, 8)),
+    ]
+    with GameRecordWriter(path) as writer:
+        for record in records[:2]:
+            writer.write(record)
+    with GameRecordWriter(path) as writer:
+        for record in records[2:]:
+            writer.write(record)
+    with GameRecordReader(path) as reader:
+        assert list(reader) == records
+        assert reader[-1] == records[-1]
+        assert bytes(reader.moves(1)) == bytes(records[1].moves)
+        with pytest.raises(IndexError):
+            reader.moves(len(records))
+        with pytest.raises(IndexError):
+            reader[-len(records) - 1]
+
+
+def test_replay_ends_on_the_final_board():
+    game = played_game(4, 3, 4)
+    boards = list(replay(record_from_game(game)))
+    assert len(boards) == len(game.moves)
+    assert boards[-1] == [list(row) for row in game.state.rows()]
+
+
+def test_a_record_cut_short_is_dropped(tmp_path):
+    path = tmp_path / "games.bin"
+    with GameRecordWriter(str(path)) as writer:
+        writer.write(record_from_game(played_game(3, 2, 5)))
+        writer.write(record_from_game(played_game(3, 2, 6)))
+    data = path.read_bytes()
+    path.write_bytes(data[:-10])
+    with GameRecordReader(str(path)) as reader:
+        assert len(reader) == 1
+    last = record_from_game(played_game(3, 2, 7))
+    with GameRecordWriter(str(path)) as writer:
+        writer.write(last)
+    with GameRecordReader(str(path)) as reader:
+        assert len(reader) == 2 and reader[1] == last
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "games.bin"
+    path.write_bytes(b"not a record file".ljust(HEADER.size))
+    with pytest.raises(ValueError):
+        GameRecordReader(str(path))
+    with pytest.raises(ValueError):
+        GameRecordWriter(str(path))
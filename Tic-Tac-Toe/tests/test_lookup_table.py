@@ -0,0 +1,36 @@
+import pytest
+
+from bitboard import CLASSIC
+from brute_force import expected_score, open_positions, sides, solve, solve_moves
+from engine import WIN_SCORE
+from lookup_table import build_table, load_table
+
+
+@pytest.fixture(scope="module")
+def table_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("table") / "perfect_play.bin")
+    build_table(path)
+    return path
+
+
+def test_lookup_table_matches_solver(table_path):
+    memo = {}
+    table = load_table(WIN_SCORE, table_path)
+    try:
+        for x, o in open_positions(CLASSIC):
+            mine, theirs, _ = sides(x, o)
+            move, score = table.lookup(x, o)
+            assert score == expected_score(*solve(CLASSIC, mine, theirs, memo), WIN_SCORE), (x, o)
+            value = solve_moves(CLASSIC, mine, theirs, memo)[move]
+            assert expected_score(*value, WIN_SCORE) == score, (x, o, move)
+    finally:
+        table.close()
+
+
+def test_lookup_table_refuses_a_mismatched_file(table_path, tmp_path):
+    assert load_table(WIN_SCORE + 1, table_path) is None
+    assert load_table(WIN_SCORE, str(tmp_path / "missing.bin")) is None
+    truncated = tmp_path / "truncated.bin"
+    with open(table_path, "rb") as f:
+        truncated.write_bytes(f.read()[:-1])
+    assert load_table(WIN_SCORE, str(truncated)) is None
@@ -0,0 +1,34 @@
+import pytest
+
+from bitboard import CLASSIC, geometry, iter_bits
+from brute_force import random_positions, sides
+from mcts import mcts_move, run_tree
+
+
+def test_mcts_takes_an_immediate_win():
+    # X can finish the top row
+    assert mcts_move(CLASSIC, 0b000000011, 0b000101000, playouts=10, workers=1) == 2
+
+
+def test_mcts_blocks_a_threat():
+    # O threatens the middle column; the block gets the most visits
+    visits = run_tree(3, 3, 0b100000001, 0b000010010, playouts=3000, seed=6)
+    assert max(visits, key=visits.get) == 7
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_mcts_returns_legal_moves(workers):
+    geo = geometry(5, 4)
+    for x, o in random_positions(geo, 6, 5, workers):
+        mine, theirs, _ = sides(x, o)
+        move = mcts_move(geo, mine, theirs, playouts=200, workers=workers)
+        assert move in set(iter_bits(geo.full_mask & ~(x | o)))
+
+
+def test_mcts_needs_a_limit():
+    with pytest.raises(ValueError):
+        run_tree(3, 3, 0, 0)
+
+
+def test_mcts_tree_is_reproducible_from_a_seed():
+    assert run_tree(4, 4, 0, 0, playouts=500, seed=3) == run_tree(4, 4, 0, 0, playouts=500, seed=3)
@@ -0,0 +1,23 @@
+from bitboard import CLASSIC
+from brute_force import expected_score, open_positions, sides, solve, solve_moves
+from engine import WIN_SCORE, TicTacToe
+
+
+def test_minimax_solves_every_3x3_position():
+    memo = {}
+    game = TicTacToe()
+    for x, o in open_positions(CLASSIC):
+        mine, theirs, player = sides(x, o)
+        game.set_position(x, o)
+        score, move = game.minimax(True, player, "O" if player == "X" else "X")
+        assert score == expected_score(*solve(CLASSIC, mine, theirs, memo), WIN_SCORE), (x, o)
+        value = solve_moves(CLASSIC, mine, theirs, memo)[game.state.cell_index(*move)]
+        assert expected_score(*value, WIN_SCORE) == score, (x, o, move)
+
+
+def test_minimax_prefers_the_faster_win():
+    # X can finish the top row now or set up a fork that wins later
+    game = TicTacToe()
+    game.set_position(0b000000011, 0b000101000)
+    score, move = game.minimax(True, "X", "O")
+    assert move == (0, 2) and score == WIN_SCORE - 1
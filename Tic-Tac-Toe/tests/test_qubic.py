@@ -0,0 +1,67 @@
+import random
+
+from bitboard import geometry, iter_bits
+from engine import TicTacToe
+from qubic import QubicSearch
+from search import WIN
+
+
+def test_qubic_search_tracks_lines_incrementally():
+    geo = geometry(4, dimensions=3)
+    search = QubicSearch(geo)
+    rng = random.Random(5)
+    played = []
+    for _ in range(40):
+        empty = geo.full_mask & ~(search.bits[0] | search.bits[1])
+        cell = rng.choice(list(iter_bits(empty)))
+        side = len(played) % 2
+        search._play(side, cell)
+        played.append((side, cell))
+        if len(played) % 3 == 0:
+            search._undo(*played.pop())
+        fresh = QubicSearch(geo)
+        fresh._reset(search.bits[0], search.bits[1])
+        for name in ("counts", "threats", "builds", "score"):
+            assert getattr(search, name) == getattr(fresh, name), (name, played)
+
+
+def test_qubic_forced_win_holds_against_every_defence():
+    # 3x3x3 is a first-player win; check the line the search claims, reply by reply
+    geo = geometry(3, dimensions=3)
+    score, _ = QubicSearch(geo, 2000).search(0, 0)
+    assert score > WIN // 2
+    plies = WIN - score
+
+    def wins(attacker, defender, plies):
+        for cell in iter_bits(geo.full_mask & ~(attacker | defender)):
+            if geo.wins_through(attacker | (1 << cell), cell):
+                return True
+        if plies < 3:
+            return False
+        _, move = QubicSearch(geo, 2000).search(attacker, defender)
+        attacker |= 1 << move
+        for reply in iter_bits(geo.full_mask & ~(attacker | defender)):
+            if geo.wins_through(defender | (1 << reply), reply):
+                return False
+            if not wins(attacker, defender | (1 << reply), plies - 2):
+                return False
+        return True
+
+    assert wins(0, 0, plies)
+
+
+def test_cube_undo_and_redo_round_trip():
+    rng = random.Random(21)
+    for _ in range(20):
+        game = TicTacToe(size=4, dimensions=3)
+        states = [game.state]
+        while not game.state.is_over():
+            game.make_move(*rng.choice(game.get_available_moves()), game.current_player)
+            states.append(game.state)
+            assert game.state.without(game.moves[-1]) == states[-2]
+        for state in reversed(states[:-1]):
+            game.undo_move()
+            assert game.state == state and game.state.winner == state.winner
+        for state in states[1:]:
+            game.redo_move()
+            assert game.state == state and game.state.winner == state.winner
@@ -0,0 +1,64 @@
+import csv
+
+from results_log import ResultLog
+
+
+def result(n):
+    return {"Time": f"2026-01-01 00:00:{n:02d}", "Winner": "X" if n % 2 else "O", "Difficulty": "Easy"}
+
+
+def test_results_are_written_in_batches(tmp_path):
+    path = tmp_path / "results.log"
+    log = ResultLog(str(path), batch_size=3)
+    log.append(result(0))
+    log.append(result(1))
+    assert not path.exists()
+    log.append(result(2))
+    assert len(path.read_text().splitlines()) == 3
+    log.append(result(3))
+    log.close()
+    assert len(path.read_text().splitlines()) == 4
+
+
+def test_rotation_keeps_only_the_newest_backups(tmp_path):
+    path = str(tmp_path / "results.log")
+    log = ResultLog(path, batch_size=1, max_bytes=200, backups=2)
+    for n in range(40):
+        log.append(result(n))
+    log.close()
+    assert log.paths() == [path + ".2", path + ".1", path]
+    kept = list(log.iter_results())
+    # Oldest results went with the dropped backups; the rest are in order
+    assert kept == [result(n) for n in range(40 - len(kept), 40)]
+
+
+def test_recent_results_reload_across_backups(tmp_path):
+    path = str(tmp_path / "results.log")
+    log = ResultLog(path, batch_size=1, max_bytes=200, backups=5)
+    for n in range(20):
+        log.append(result(n))
+    log.close()
+    assert len(log.paths()) > 1
+    reopened = ResultLog(path, recent_size=10, backups=5)
+    assert list(reopened.recent) == [result(n) for n in range(10, 20)]
+
+
+def test_a_cut_short_line_is_skipped(tmp_path):
+    path = tmp_path / "results.log"
+    path.write_text('{"Time": "2026-01-01 00:00:00", "Win')
+    log = ResultLog(str(path))
+    assert len(log) == 0
+    log.append(result(1))
+    log.close()
+    assert list(ResultLog(str(path)).recent) == [result(1)]
+
+
+def test_export_streams_every_file(tmp_path):
+    log = ResultLog(str(tmp_path / "results.log"), batch_size=4, max_bytes=200)
+    for n in range(12):
+        log.append(result(n))
+    export = tmp_path / "results.csv"
+    assert log.export_csv(str(export)) == 12
+    with open(export, newline="") as f:
+        assert list(csv.DictReader(f)) == [result(n) for n in range(12)]
+    log.close()
@@ -0,0 +1,50 @@
+import time
+
+from bitboard import geometry
+from brute_force import expected_score, random_positions, sides, solve
+from engine import TicTacToe
+from search import WIN, DeepeningSearch
+
+
+def bits(geo, *cells):
+    return sum(1 << geo.size * row + col for row, col in cells)
+
+
+def five_by_five(x_cells, o_cells):
+    game = TicTacToe(size=5, win_length=4)
+    game.set_position(bits(game.geometry, *x_cells), bits(game.geometry, *o_cells))
+    return game
+
+
+def test_search_takes_a_win_on_a_longer_board():
+    game = five_by_five([(2, 0), (2, 1), (2, 2)], [(0, 0), (0, 4), (4, 4)])
+    assert game.choose_move("X") == (2, 3)
+    score, _ = DeepeningSearch(game.geometry, 1000).search(game.state.x, game.state.o)
+    assert score == WIN - 1
+
+
+def test_search_blocks_a_win_on_a_longer_board():
+    # O threatens the diagonal's open end; X has nothing faster
+    game = five_by_five([(0, 0), (0, 4), (4, 0)], [(1, 1), (2, 2), (3, 3)])
+    assert game.choose_move("X") == (4, 4)
+
+
+def test_search_settles_late_positions_exactly():
+    geo = geometry(4, 3)
+    memo = {}
+    for x, o in random_positions(geo, 9, 30, 5):
+        mine, theirs, _ = sides(x, o)
+        score, _ = DeepeningSearch(geo, 10000).search(mine, theirs)
+        outcome, plies = solve(geo, mine, theirs, memo)
+        if outcome:
+            assert score == expected_score(outcome, plies, WIN), (x, o)
+        else:
+            assert abs(score) < WIN // 2, (x, o)
+
+
+def test_search_keeps_to_its_time_budget():
+    geo = geometry(7, 5)
+    start = time.perf_counter()
+    _, move = DeepeningSearch(geo, 100).search(0, 0)
+    assert move is not None
+    assert time.perf_counter() - start < 1.0
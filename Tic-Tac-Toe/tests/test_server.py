@@ -0,0 +1,134 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from server import MAX_LINE, GameServer
+
+
+def run(scenario):
+    # Serves on a free port with AI moves on threads, then runs scenario(server, connect)
+    async def main():
+        server = GameServer(time_budget_ms=50)
+        server.executor = ThreadPoolExecutor(max_workers=2)
+        server.ai_slots = asyncio.Semaphore(4)
+        listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0, limit=MAX_LINE)
+        port = listener.sockets[0].getsockname()[1]
+
+        async def connect():
+            return Client(*await asyncio.open_connection("127.0.0.1", port))
+
+        try:
+            async with listener:
+                await asyncio.wait_for(scenario(server, connect), 10)
+        finally:
+            server.close()
+
+    asyncio.run(main())
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def send(self, message):
+        self.writer.write((json.dumps(message) + "\n").encode())
+        await self.writer.drain()
+
+    async def receive(self):
+        return json.loads(await self.reader.readline())
+
+
+async def play_first_free(client, taken, size=3):
+    row, col = next(divmod(i, size) for i in range(size * size) if i not in taken)
+    await client.send({"type": "move", "row": row, "col": col})
+
+
+def test_ai_game_plays_to_the_end():
+    async def scenario(server, connect):
+        client = await connect()
+        await client.send({"type": "play", "opponent": "ai", "side": "X"})
+        start = await client.receive()
+        assert start["type"] == "start" and start["you"] == "X" and start["opponent"] == "ai"
+        taken = set()
+        turn = "X"
+        while turn is not None:
+            if turn == "X":
+                await play_first_free(client, taken)
+            message = await client.receive()
+            assert message["type"] == "move"
+            taken.add(3 * message["row"] + message["col"])
+            turn = message["turn"]
+        over = await client.receive()
+        # Filling cells in order never beats the perfect-play AI
+        assert over["type"] == "over" and over["winner"] != "X"
+        assert server.games_finished == 1 and not server.sessions
+
+    run(scenario)
+
+
+def test_human_players_are_matched_and_take_turns():
+    async def scenario(server, connect):
+        first = await connect()
+        second = await connect()
+        await first.send({"type": "play", "opponent": "human"})
+        assert (await first.receive())["type"] == "waiting"
+        await second.send({"type": "play", "opponent": "human"})
+        assert (await first.receive())["you"] == "X"
+        assert (await second.receive())["you"] == "O"
+        await second.send({"type": "move", "row": 0, "col": 0})
+        assert (await second.receive()) == {"type": "error", "message": "not your turn"}
+        await first.send({"type": "move", "row": 1, "col": 1})
+        for client in first, second:
+            assert await client.receive() == {"type": "move", "player": "X", "row": 1, "col": 1, "turn": "O"}
+        await second.send({"type": "leave"})
+        over = await first.receive()
+        assert over["type"] == "over" and over["winner"] == "X" and over["reason"] == "opponent left"
+
+    run(scenario)
+
+
+def test_invalid_requests_get_errors():
+    async def scenario(server, connect):
+        client = await connect()
+        for request in (
+            "not json",
+            [1, 2],
+            {"type": "dance"},
+            {"type": "move", "row": 0, "col": 0},
+            {"type": "play", "size": True},
+            {"type": "play", "size": 9},
+            {"type": "play", "size": 4, "win_length": True},
+            {"type": "play", "difficulty": "Impossible"},
+            {"type": "play", "opponent": "robot"},
+        ):
+            await client.send(request)
+            assert (await client.receive())["type"] == "error", request
+        await client.send({"type": "play", "opponent": "ai", "side": "X"})
+        assert (await client.receive())["type"] == "start"
+        for row, col in ((True, 0), (0, False), (3, 0), ("0", 0)):
+            await client.send({"type": "move", "row": row, "col": col})
+            assert (await client.receive())["type"] == "error", (row, col)
+
+    run(scenario)
+
+
+def test_failed_ai_move_ends_the_game(monkeypatch):
+    def fail(*args):
+        raise RuntimeError("worker died")
+
+    monkeypatch.setattr("server._ai_move", fail)
+
+    async def scenario(server, connect):
+        client = await connect()
+        await client.send({"type": "play", "opponent": "ai", "side": "O"})
+        assert (await client.receive())["type"] == "start"
+        assert (await client.receive()) == {"type": "error", "message": "AI move failed"}
+        over = await client.receive()
+        assert over["type"] == "over" and over["winner"] is None and over["reason"] == "AI move failed"
+        assert not server.sessions
+        # The connection is free to start another game
+        await client.send({"type": "play", "opponent": "human"})
+        assert (await client.receive())["type"] == "waiting"
+
+    run(scenario)
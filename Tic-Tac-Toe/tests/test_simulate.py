@@ -0,0 +1,32 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch import EMPTY, O, X
+from simulate import BatchSimulator
+
+
+def test_counts_cover_every_game():
+    counts = BatchSimulator("random", "random", seed=1).run(1000, batch_size=300)
+    assert sum(counts.values()) == 1000
+    assert counts[X] > counts[O] > 0 and counts[EMPTY] > 0
+
+
+def test_perfect_play_always_draws():
+    assert BatchSimulator("minimax", "minimax", seed=2).run(200) == {X: 0, O: 0, EMPTY: 200}
+
+
+def test_perfect_play_never_loses_to_random():
+    assert BatchSimulator("random", "minimax", seed=3).run(500)[X] == 0
+    assert BatchSimulator("minimax", "random", seed=3).run(500)[O] == 0
+
+
+def test_runs_are_reproducible_from_a_seed():
+    first = BatchSimulator("random", "random", size=4, seed=4).play_batch(200)
+    second = BatchSimulator("random", "random", size=4, seed=4).play_batch(200)
+    assert np.array_equal(first, second)
+
+
+def test_larger_boards_use_the_per_board_engines():
+    winners = BatchSimulator("minimax", "random", size=4, win_length=3, seed=5, time_budget_ms=20).play_batch(5)
+    assert len(winners) == 5 and not (winners == O).any()
@@ -0,0 +1,46 @@
+import pytest
+
+from bitboard import CLASSIC, geometry
+from engine import TicTacToe
+from state import GameState
+
+
+def test_states_are_immutable():
+    state = GameState()
+    with pytest.raises(AttributeError):
+        state.x = 1
+    with pytest.raises(AttributeError):
+        del state.o
+    with pytest.raises(AttributeError):
+        state.extra = 1
+
+
+def test_apply_returns_a_new_state():
+    start = GameState()
+    after = start.apply(4)
+    assert start == GameState() and start.x == 0
+    assert after.x == 1 << 4 and after.to_move == "O"
+    assert after.without(4) == start
+    with pytest.raises(ValueError):
+        after.apply(4)
+
+
+def test_equal_positions_hash_alike():
+    by_order = GameState().apply(0).apply(4).apply(8)
+    other_order = GameState().apply(8).apply(4).apply(0)
+    from_bits = GameState.from_bits(1 | 1 << 8, 1 << 4)
+    assert by_order == other_order == from_bits
+    assert len({by_order, other_order, from_bits}) == 1
+    # The side to move and the board are part of a position
+    assert by_order.with_turn("X") != by_order
+    assert GameState(geometry=geometry(4)) != GameState(geometry=geometry(4, 3))
+    assert GameState(geometry=CLASSIC) == GameState(geometry=geometry(3))
+
+
+def test_session_copies_share_positions_but_not_history():
+    game = TicTacToe()
+    game.make_move(1, 1, "X")
+    copy = game.copy()
+    assert copy.state is game.state
+    copy.make_move(0, 0, "O")
+    assert game.moves == [4] and game.state.o == 0
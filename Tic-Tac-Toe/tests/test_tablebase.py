@@ -0,0 +1,44 @@
+import pytest
+
+from bitboard import CLASSIC, geometry
+from brute_force import open_positions, random_positions, sides, solve, solve_moves
+from tablebase import build_tablebase, get_tablebase, load_tablebase
+
+
+def check_tablebase(tablebase, geo, positions):
+    memo = {}
+    for x, o in positions:
+        mine, theirs, player = sides(x, o)
+        expected = solve_moves(geo, mine, theirs, memo)
+        assert tablebase.lookup(x, o) == solve(geo, mine, theirs, memo), (x, o)
+        values = tablebase.move_values(mine, theirs, player == "X")
+        assert {cell: (outcome, plies) for cell, outcome, plies in values} == expected, (x, o)
+
+
+def test_built_3x3_tablebase_matches_solver(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "tablebase_3x3_3.bin")
+    build_tablebase(3, 3, path, workers=1)
+    tablebase = load_tablebase(CLASSIC, path)
+    try:
+        check_tablebase(tablebase, CLASSIC, open_positions(CLASSIC))
+    finally:
+        tablebase.close()
+
+
+def test_4x4_tablebase_matches_solver_on_sampled_positions():
+    geo = geometry(4)
+    tablebase = get_tablebase(geo)
+    if tablebase is None:
+        pytest.skip("tablebase_4x4_4.bin has not been built")
+    check_tablebase(tablebase, geo, random_positions(geo, 8, 40, 20))
+
+
+def test_tablebase_rejects_a_file_for_another_board(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "tablebase_3x3_3.bin")
+    build_tablebase(3, 3, path, workers=1)
+    assert load_tablebase(geometry(4), path) is None
+    with open(path, "r+b") as f:
+        f.truncate(100)
+    assert load_tablebase(CLASSIC, path) is None
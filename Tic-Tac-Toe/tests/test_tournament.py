@@ -0,0 +1,54 @@
+import pytest
+
+from tournament import Tournament, elo_ratings, play_block, round_robin, scores_by_pair, swiss_pairings
+
+
+def test_round_robin_meets_everyone_once():
+    pairings = round_robin(["a", "b", "c", "d"])
+    assert len(pairings) == 6 and len({frozenset(p) for p in pairings}) == 6
+
+
+@pytest.mark.parametrize("count", [3, 5, 7])
+def test_no_second_bye_before_everyone_has_had_one(count):
+    names = [f"p{n}" for n in range(count)]
+    by_pair = {}
+    byes = {}
+    for round_number in range(2 * count):
+        pairings, bye = swiss_pairings(names, by_pair, byes)
+        assert sorted([bye] + [name for pair in pairings for name in pair]) == names
+        byes[bye] = byes.get(bye, 0) + 1
+        assert max(byes.values()) - min(byes.get(name, 0) for name in names) <= 1, round_number
+        # The earlier name always wins, so the same player stays at the bottom
+        for a, b in pairings:
+            key = tuple(sorted((a, b)))
+            by_pair.setdefault(key, []).append(1.0)
+
+
+def test_even_fields_have_no_bye():
+    pairings, bye = swiss_pairings(["a", "b", "c", "d"], {}, {})
+    assert bye is None and len(pairings) == 2
+
+
+def test_swiss_tournament_spreads_the_byes(tmp_path):
+    names = ["minimax", "noisy-25", "noisy-50", "depth-1", "random"]
+    tournament = Tournament(names, 2, "swiss", rounds=5, workers=2, checkpoint=str(tmp_path / "t.json"))
+    tournament.run()
+    sat_out = []
+    for round_number in range(1, 6):
+        played = {
+            name for job_id, (x_name, o_name, _) in tournament.results.items()
+            if job_id.startswith(f"{round_number}:") for name in (x_name, o_name)
+        }
+        sat_out.extend(set(names) - played)
+    assert sorted(sat_out) == sorted(names)
+
+
+def test_seeded_games_are_reproducible():
+    seeds = list(range(8))
+    assert play_block("mcts", "noisy-50", seeds, 3, None, 50) == play_block("mcts", "noisy-50", seeds, 3, None, 50)
+
+
+def test_stronger_players_rate_higher():
+    results = {"0:minimax:random:0": ("minimax", "random", ["X"] * 9 + [None])}
+    ratings = elo_ratings(["minimax", "random"], scores_by_pair(results))
+    assert ratings["minimax"][0] > 1500 > ratings["random"][0]
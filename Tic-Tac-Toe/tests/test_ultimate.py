@@ -0,0 +1,60 @@
+import random
+
+from bitboard import iter_bits
+from engine import UltimateTicTacToe
+from search import WIN
+from ultimate import UltimateSearch, UltimateState
+
+
+def fields(state):
+    return state.x, state.o, state.x_won, state.o_won, state.closed, state.active, state.to_move, state.winner
+
+
+def test_ultimate_undo_and_redo_round_trip():
+    rng = random.Random(22)
+    for _ in range(20):
+        game = UltimateTicTacToe()
+        states = [fields(game.state)]
+        while not game.state.is_over():
+            game.make_move(*rng.choice(game.get_available_moves()), game.current_player)
+            states.append(fields(game.state))
+        for state in reversed(states[:-1]):
+            game.undo_move()
+            assert fields(game.state) == state
+        for state in states[1:]:
+            game.redo_move()
+            assert fields(game.state) == state
+
+
+def test_ultimate_search_takes_an_immediate_win():
+    rng = random.Random(7)
+    checked = 0
+    while checked < 10:
+        state = UltimateState()
+        while not state.is_over():
+            moves = list(iter_bits(state.legal_mask()))
+            winning = [m for m in moves if state.apply(m).winner is not None]
+            if winning:
+                score, move = UltimateSearch(1000).search(state)
+                assert score == WIN - 1 and move in winning
+                checked += 1
+                break
+            state = state.apply(rng.choice(moves))
+
+
+def test_legal_moves_follow_the_send_rule():
+    # A brute-force reading of the rules, against the precomputed move lists
+    rng = random.Random(9)
+    for _ in range(20):
+        state = UltimateState()
+        while not state.is_over():
+            taken = state.x | state.o
+            open_boards = [b for b in range(9) if not state.closed >> b & 1]
+            boards = [state.active] if state.active in open_boards else open_boards
+            expected = {9 * b + c for b in boards for c in range(9) if not taken >> (9 * b + c) & 1}
+            moves = set(iter_bits(state.legal_mask()))
+            assert moves == expected
+            move = rng.choice(sorted(moves))
+            after = state.apply(move)
+            assert after.active == move % 9 or after.closed >> (move % 9) & 1 and after.active == -1
+            state = after
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from engine import TicTacToe
+from state import GameState
+
+
+def play_out(game, rng):
+    # Random moves to the end of the game; returns the state after every move, the start included
+    states = [game.state]
+    while not game.state.is_over():
+        game.make_move(*rng.choice(game.get_available_moves()), game.current_player)
+        states.append(game.state)
+    return states
+
+
+@pytest.mark.parametrize("size, win_length", [(3, 3), (5, 4)])
+def test_undo_and_redo_round_trip(size, win_length):
+    rng = random.Random(size)
+    for _ in range(20):
+        game = TicTacToe(size=size, win_length=win_length)
+        states = play_out(game, rng)
+        for state in reversed(states[:-1]):
+            game.undo_move()
+            assert game.state == state and game.state.winner == state.winner
+        assert game.undo_move() is None
+        for state in states[1:]:
+            game.redo_move()
+            assert game.state == state and game.state.winner == state.winner
+        assert game.redo_move() is None
+
+
+def test_incremental_winner_matches_a_full_scan():
+    rng = random.Random(17)
+    for _ in range(50):
+        game = TicTacToe(size=4)
+        for state in play_out(game, rng):
+            scanned = GameState.from_bits(state.x, state.o, state.geometry, state.to_move)
+            assert state.winner == scanned.winner
+            assert state.winning_mask() == scanned.winning_mask()
+
+
+def test_a_new_move_clears_the_redo_history():
+    game = TicTacToe()
+    game.make_move(0, 0, "X")
+    game.make_move(1, 1, "O")
+    assert game.undo_move() == (1, 1)
+    assert game.current_player == "O"
+    game.make_move(2, 2, "O")
+    assert game.redo_move() is None
+    assert game.moves == [0, 8]
@@ -0,0 +1,367 @@
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from engine import TicTacToe
+from mcts import mcts_move
+from search import DeepeningSearch
+
+# Round-robin or Swiss tournaments between registered players, played in a
+# process pool. Every finished block of games is saved to a checkpoint file,
+# so an interrupted run picks up where it stopped.
+PLAYERS = {}
+BLOCK_SIZE = 10  # Games per pool job, and per checkpoint entry
+ELO_SCALE = 400 / math.log(10)
+PRIOR_DRAWS = 1  # Virtual draws against a 1500 player, so unbeaten players get finite ratings
+CHECKPOINT_EVERY = 1.0  # Seconds between checkpoint writes
+MCTS_PLAYOUTS = 2000  # Per move; a count rather than a time budget keeps seeded games reproducible
+
+
+def player(name):
+    def register(func):
+        PLAYERS[name] = func
+        return func
+    return register
+
+
+# A player is called as func(game, symbol, rng) and returns (row, col)
+@player("random")
+def random_player(game, symbol, rng):
+    return rng.choice(game.get_available_moves())
+
+
+@player("minimax")
+def minimax_player(game, symbol, rng):
+    game.difficulty = "Unbeatable"
+    return game.choose_move(symbol)
+
+
+@player("mcts")
+def mcts_player(game, symbol, rng):
+    opponent = "O" if symbol == "X" else "X"
+    move = mcts_move(game.geometry, game.board.bits(symbol), game.board.bits(opponent), MCTS_PLAYOUTS,
+                     time_budget_ms=None, workers=1, seed=rng.randrange(1 << 30))
+    return game.board.cell_coords(move)
+
+
+def depth_limited(depth):
+    def play(game, symbol, rng):
+        search = DeepeningSearch(game.geometry, game.time_budget_ms, max_depth=depth)
+        opponent = "O" if symbol == "X" else "X"
+        _, move = search.search(game.board.bits(symbol), game.board.bits(opponent))
+        return game.board.cell_coords(move)
+    return play
+
+
+def noisy(probability):
+    # Plays a random move with the given probability, otherwise the minimax move
+    def play(game, symbol, rng):
+        if rng.random() < probability:
+            return random_player(game, symbol, rng)
+        return minimax_player(game, symbol, rng)
+    return play
+
+
+for _depth in (1, 2, 4):
+    player(f"depth-{_depth}")(depth_limited(_depth))
+for _percent in (10, 25, 50):
+    player(f"noisy-{_percent}")(noisy(_percent / 100))
+
+
+def play_block(x_name, o_name, seeds, size, win_length, time_budget_ms):
+    # Runs in a pool worker; returns the winner of each game ("X", "O" or None)
+    results = []
+    for seed in seeds:
+        rng = random.Random(seed)
+        game = TicTacToe(size=size, win_length=win_length, time_budget_ms=time_budget_ms, mcts_workers=1)
+        players = {"X": PLAYERS[x_name], "O": PLAYERS[o_name]}
+        while not game.check_winner() and not game.is_draw():
+            symbol = game.current_player
+            row, col = players[symbol](game, symbol, rng)
+            game.make_move(row, col, symbol)
+        results.append(game.check_winner())
+    return results
+
+
+def pairing_jobs(round_number, pairings, games, seed):
+    # Both colours, games per pairing in total, split into BLOCK_SIZE blocks
+    jobs = []
+    for a, b in pairings:
+        for x_name, o_name, count in ((a, b, (games + 1) // 2), (b, a, games // 2)):
+            for start in range(0, count, BLOCK_SIZE):
+                job_id = f"{round_number}:{x_name}:{o_name}:{start}"
+                seeds = [zlib.crc32(f"{seed}:{job_id}:{n}".encode()) for n in range(start, min(start + BLOCK_SIZE, count))]
+                jobs.append((job_id, x_name, o_name, seeds))
+    return jobs
+
+
+def round_robin(names):
+    return [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+
+
+def swiss_pairings(names, by_pair, byes):
+    # Strongest first; each player meets the next one it has not played yet. With an
+    # odd field the lowest-ranked player among those with the fewest byes ({name: count})
+    # sits out first. Returns (pairings, that player or None)
+    standings = points(names, by_pair)
+    order = sorted(names, key=lambda name: (-standings[name], name))
+    bye = None
+    if len(order) % 2:
+        fewest = min(byes.get(name, 0) for name in order)
+        bye = [name for name in order if byes.get(name, 0) == fewest][-1]
+        order.remove(bye)
+    pairings = []
+    while len(order) > 1:
+        a = order.pop(0)
+        fresh = [b for b in order if tuple(sorted((a, b))) not in by_pair]
+        b = fresh[0] if fresh else order[0]
+        order.remove(b)
+        pairings.append((a, b))
+    return pairings, bye
+
+
+def scores_by_pair(results):
+    # {(a, b) sorted by name: [a's score in each game]} from {job_id: (x_name, o_name, winners)}
+    scores = {}
+    for x_name, o_name, winners in results.values():
+        key = tuple(sorted((x_name, o_name)))
+        for winner in winners:
+            score = 0.5 if winner is None else 1.0 if winner == "X" else 0.0
+            scores.setdefault(key, []).append(score if key[0] == x_name else 1.0 - score)
+    return scores
+
+
+def points(names, by_pair):
+    totals = {name: 0.0 for name in names}
+    for (a, b), scores in by_pair.items():
+        totals[a] += sum(scores)
+        totals[b] += len(scores) - sum(scores)
+    return totals
+
+
+class Tournament:
+    def __init__(self, names, games, schedule="round-robin", rounds=None, size=3, win_length=None,
+                 time_budget_ms=50, seed=0, workers=None, checkpoint=None):
+        self.names = list(names)
+        self.games = games
+        self.schedule = schedule
+        self.rounds = rounds or max(1, math.ceil(math.log2(len(self.names))))
+        self.size = size
+        self.win_length = win_length
+        self.time_budget_ms = time_budget_ms
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint = checkpoint
+        self.results = {}  # job_id -> (x_name, o_name, winners)
+        self.last_save = 0.0
+
+    def config(self):
+        return {
+            "players": self.names, "games": self.games, "schedule": self.schedule, "rounds": self.rounds,
+            "size": self.size, "win_length": self.win_length, "time_budget_ms": self.time_budget_ms,
+            "seed": self.seed,
+        }
+
+    def load(self):
+        # Returns the number of blocks restored from the checkpoint
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved["config"] != self.config():
+            raise ValueError(f"{self.checkpoint} belongs to a tournament with other settings")
+        self.results = {job_id: tuple(entry) for job_id, entry in saved["results"].items()}
+        return len(self.results)
+
+    def save(self):
+        if not self.checkpoint:
+            return
+        tmp_path = self.checkpoint + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"config": self.config(), "results": self.results}, f)
+        os.replace(tmp_path, self.checkpoint)
+        self.last_save = time.monotonic()
+
+    def run(self, progress=None):
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                if self.schedule == "swiss":
+                    byes = {}
+                    for round_number in range(1, self.rounds + 1):
+                        # Only earlier rounds count, so a resumed run pairs the same way
+                        earlier = {
+                            job_id: entry for job_id, entry in self.results.items()
+                            if int(job_id.split(":")[0]) < round_number
+                        }
+                        pairings, bye = swiss_pairings(self.names, scores_by_pair(earlier), byes)
+                        if bye is not None:
+                            byes[bye] = byes.get(bye, 0) + 1
+                        self._run_jobs(pool, pairing_jobs(round_number, pairings, self.games, self.seed), progress)
+                else:
+                    self._run_jobs(pool, pairing_jobs(0, round_robin(self.names), self.games, self.seed), progress)
+            finally:
+                self.save()
+
+    def _run_jobs(self, pool, jobs, progress):
+        todo = [job for job in jobs if job[0] not in self.results]
+        pending = {
+            pool.submit(play_block, x_name, o_name, seeds, self.size, self.win_length, self.time_budget_ms):
+            (job_id, x_name, o_name)
+            for job_id, x_name, o_name, seeds in todo
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id, x_name, o_name = pending.pop(future)
+                    self.results[job_id] = (x_name, o_name, future.result())
+                if progress is not None:
+                    progress(len(todo) - len(pending), len(todo))
+                if time.monotonic() - self.last_save >= CHECKPOINT_EVERY:
+                    self.save()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def elo_ratings(names, by_pair, iterations=50):
+    # Maximum-likelihood Elo with draws as half points. Returns {name: (rating, 95% margin)}
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    pairs = [(index[a], index[b], len(scores), sum(scores)) for (a, b), scores in by_pair.items()]
+    ratings = [0.0] * n
+    for _ in range(iterations):
+        gradient, hessian = _elo_derivatives(ratings, pairs)
+        step = _solve(hessian, gradient)
+        ratings = [r - s for r, s in zip(ratings, step)]
+        if max(abs(s) for s in step) < 1e-9:
+            break
+    _, hessian = _elo_derivatives(ratings, pairs)
+    covariance = _inverse([[-value for value in row] for row in hessian])
+    # Ratings are reported around a mean of 1500, so the margins are for each
+    # rating relative to the field rather than to the prior's fixed player
+    mean = sum(ratings) / n
+    row_means = [sum(row) / n for row in covariance]
+    total_mean = sum(row_means) / n
+    return {
+        name: (
+            1500 + ELO_SCALE * (ratings[i] - mean),
+            1.96 * ELO_SCALE * math.sqrt(max(covariance[i][i] - 2 * row_means[i] + total_mean, 0.0)),
+        )
+        for name, i in index.items()
+    }
+
+
+def _elo_derivatives(ratings, pairs):
+    # Gradient and Hessian of the log-likelihood in natural units (ELO_SCALE Elo each)
+    n = len(ratings)
+    gradient = [0.0] * n
+    hessian = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        # The prior: PRIOR_DRAWS draws against a player fixed at 0
+        expected = 1.0 / (1.0 + math.exp(-ratings[i]))
+        gradient[i] += PRIOR_DRAWS * (0.5 - expected)
+        hessian[i][i] -= PRIOR_DRAWS * expected * (1.0 - expected)
+    for a, b, count, score in pairs:
+        expected = 1.0 / (1.0 + math.exp(ratings[b] - ratings[a]))
+        gradient[a] += score - count * expected
+        gradient[b] -= score - count * expected
+        curvature = count * expected * (1.0 - expected)
+        hessian[a][a] -= curvature
+        hessian[b][b] -= curvature
+        hessian[a][b] += curvature
+        hessian[b][a] += curvature
+    return gradient, hessian
+
+
+def _solve(matrix, vector):
+    # Gaussian elimination with partial pivoting; the matrices here are tiny
+    n = len(vector)
+    rows = [list(row) + [value] for row, value in zip(matrix, vector)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(n):
+            if r != col and rows[r][col]:
+                factor = rows[r][col] / rows[col][col]
+                rows[r] = [x - factor * y for x, y in zip(rows[r], rows[col])]
+    return [rows[i][n] / rows[i][i] for i in range(n)]
+
+
+def _inverse(matrix):
+    n = len(matrix)
+    columns = [_solve(matrix, [1.0 if i == j else 0.0 for i in range(n)]) for j in range(n)]
+    return [[columns[j][i] for j in range(n)] for i in range(n)]
+
+
+def print_report(tournament):
+    by_pair = scores_by_pair(tournament.results)
+    ratings = elo_ratings(tournament.names, by_pair)
+    record = {name: [0, 0, 0] for name in tournament.names}
+    for (a, b), scores in by_pair.items():
+        for score in scores:
+            outcome = 0 if score == 1.0 else 1 if score == 0.5 else 2
+            record[a][outcome] += 1
+            record[b][2 - outcome] += 1
+    print(f"{'player':12} {'games':>6} {'wins':>6} {'draws':>6} {'losses':>6} {'score':>7} {'Elo':>12}")
+    for name in sorted(tournament.names, key=lambda name: -ratings[name][0]):
+        wins, draws, losses = record[name]
+        games = wins + draws + losses
+        score = f"{100.0 * (wins + 0.5 * draws) / games:6.1f}%" if games else f"{'-':>7}"
+        rating, margin = ratings[name]
+        print(f"{name:12} {games:6} {wins:6} {draws:6} {losses:6} {score} {rating:6.0f} ±{margin:<5.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a tournament between AI players and rate them with Elo.")
+    parser.add_argument("--players", nargs="+", default=sorted(name for name in PLAYERS if name != "mcts"),
+                        choices=sorted(PLAYERS), metavar="NAME", help=f"from: {', '.join(sorted(PLAYERS))}")
+    parser.add_argument("--games", type=int, default=20, help="games per pairing, colours alternate")
+    parser.add_argument("--schedule", choices=["round-robin", "swiss"], default="round-robin")
+    parser.add_argument("--rounds", type=int, default=None, help="Swiss rounds (default: log2 of the players)")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=None)
+    parser.add_argument("--time-budget-ms", type=int, default=50, help="per move, for searches that cannot finish")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: every core)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default="tournament.json", help="results file that lets a run resume")
+    parser.add_argument("--fresh", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+    if len(set(args.players)) < 2:
+        parser.error("need at least two different players")
+
+    tournament = Tournament(
+        list(dict.fromkeys(args.players)), args.games, args.schedule, args.rounds, args.size, args.win_length,
+        args.time_budget_ms, args.seed, args.workers, args.checkpoint,
+    )
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    try:
+        restored = tournament.load()
+    except ValueError as e:
+        parser.error(f"{e}; use --fresh or another --checkpoint")
+    if restored:
+        print(f"Resuming: {restored} blocks of games already played")
+
+    def progress(done, total):
+        print(f"\r{done}/{total} blocks", end="", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    try:
+        tournament.run(progress)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run again with the same options to resume from {args.checkpoint}")
+        sys.exit(130)
+    print(file=sys.stderr)
+    print(f"Played in {time.perf_counter() - start:.1f}s with {tournament.workers} workers")
+    print_report(tournament)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+
+from bitboard import CELLS, SIZE, iter_bits
+
+# Score bounds stored alongside each entry
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+def _rotate(index):
+    row, col = divmod(index, SIZE)
+    return col * SIZE + (SIZE - 1 - row)
+
+
+def _reflect(index):
+    row, col = divmod(index, SIZE)
+    return row * SIZE + (SIZE - 1 - col)
+
+
+def _symmetries():
+    # The 8 symmetries of the square as cell permutations: perm[i] is where cell i goes
+    perms = []
+    perm = list(range(CELLS))
+    for _ in range(4):
+        perms.append(tuple(perm))
+        perms.append(tuple(_reflect(p) for p in perm))
+        perm = [_rotate(p) for p in perm]
+    return tuple(perms)
+
+
+SYMMETRIES = _symmetries()
+INVERSE_SYMMETRIES = tuple(
+    tuple(perm.index(i) for i in range(CELLS)) for perm in SYMMETRIES
+)
+# SYMMETRY_MASKS[s][mask] is mask with every bit moved by symmetry s
+SYMMETRY_MASKS = tuple(
+    tuple(sum(1 << perm[i] for i in iter_bits(mask)) for mask in range(1 << CELLS))
+    for perm in SYMMETRIES
+)
+
+
+def canonical(mine, theirs):
+    # Smallest (mine, theirs) encoding over all symmetries, plus the symmetry used
+    best_key = None
+    best_sym = 0
+    for sym, table in enumerate(SYMMETRY_MASKS):
+        key = (table[mine] << CELLS) | table[theirs]
+        if best_key is None or key < best_key:
+            best_key = key
+            best_sym = sym
+    return best_key, best_sym
+
+
+class TranspositionTable:
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    def lookup(self, mine, theirs, is_maximizing):
+        key, sym = canonical(mine, theirs)
+        slot = (key << 1) | is_maximizing
+        entry = self.entries.get(slot)
+        if entry is None:
+            return None
+        self.entries.move_to_end(slot)
+        score, move, flag = entry
+        if move is not None:
+            move = INVERSE_SYMMETRIES[sym][move]
+        return score, move, flag
+
+    def store(self, mine, theirs, is_maximizing, score, move, flag=EXACT):
+        key, sym = canonical(mine, theirs)
+        if move is not None:
+            move = SYMMETRIES[sym][move]
+        slot = (key << 1) | is_maximizing
+        self.entries[slot] = (score, move, flag)
+        self.entries.move_to_end(slot)
+        # Least recently used positions are evicted first
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+# Shared by every TicTacToe instance in the process
+shared_table = TranspositionTable()
@@ -0,0 +1,391 @@
+import random
+import time
+
+from bitboard import IS_WIN, WIN_MASKS, iter_bits
+from search import EXACT, LOWER, UPPER, WIN, SearchTimeout, _score_from_table, _score_to_table
+
+# Ultimate Tic-Tac-Toe: nine 3x3 boards in a 3x3 macro board. A move at cell c
+# of a small board sends the opponent to small board c, unless that board is
+# already won or full, in which case they may play on any open board. Winning
+# a small board claims its square of the macro board.
+#
+# Moves are numbered board * 9 + cell. Each small board is one 9-bit mask per
+# player, so IS_WIN from bitboard.py is the small-board kernel, and the same
+# table applied to the 9-bit mask of won boards gives the macro result.
+SIZE = 9
+FULL = 511
+BIT = tuple(1 << i for i in range(9))
+# Precomputed move lists: the empty cells of an occupancy mask, the open boards of a closed mask
+EMPTY_CELLS = tuple(tuple(i for i in range(9) if not mask >> i & 1) for mask in range(512))
+OPEN_BOARDS = EMPTY_CELLS
+SINGLE = tuple((i,) for i in range(81))
+# BOARD_MOVES[b][mask]: the moves board * 9 + cell on the empty cells of board b
+BOARD_MOVES = tuple(tuple(tuple(9 * b + c for c in cells) for cells in EMPTY_CELLS) for b in range(9))
+# Zobrist keys: one per side and move, one per active board (index 0 for any) and one for O to move
+_rng = random.Random(81)
+ZOBRIST = tuple(tuple(_rng.getrandbits(64) for _ in range(81)) for _ in range(2))
+ACTIVE_KEYS = tuple(_rng.getrandbits(64) for _ in range(10))
+O_TO_MOVE = _rng.getrandbits(64)
+del _rng
+# Position weights of the cells of a board, and of the boards of the macro board
+WEIGHTS = (3, 2, 3, 2, 4, 2, 3, 2, 3)
+TABLE_LIMIT = 1 << 20
+
+
+def _line_score(mine, theirs, dead=0):
+    # Open lines of a 3x3 board from mine's side: two-in-a-row counts most
+    score = 0
+    for mask in WIN_MASKS:
+        if mask & dead:
+            continue
+        a = mine & mask
+        b = theirs & mask
+        if a and not b:
+            score += 1 if a & (a - 1) == 0 else 8
+        elif b and not a:
+            score -= 1 if b & (b - 1) == 0 else 8
+    return score
+
+
+# SUB_VALUES[x | o << 9]: a small board still in play, from X's side
+SUB_VALUES = {}
+for _x in range(512):
+    _free = FULL & ~_x
+    _o = _free
+    while True:
+        if not (IS_WIN[_x] or IS_WIN[_o] or (_x | _o) == FULL):
+            SUB_VALUES[_x | _o << 9] = _line_score(_x, _o) + sum(
+                WEIGHTS[i] for i in iter_bits(_x)
+            ) - sum(WEIGHTS[i] for i in iter_bits(_o))
+        if not _o:
+            break
+        _o = (_o - 1) & _free
+del _x, _o, _free
+
+_macro_values = {}  # Filled as macro positions come up
+
+
+def macro_value(x_won, o_won, closed):
+    # Won boards and macro lines from X's side; boards drawn full block their lines
+    key = x_won | o_won << 9 | closed << 18
+    value = _macro_values.get(key)
+    if value is None:
+        dead = closed & ~(x_won | o_won)
+        value = 60 * _line_score(x_won, o_won, dead) + 40 * (
+            sum(WEIGHTS[i] for i in iter_bits(x_won)) - sum(WEIGHTS[i] for i in iter_bits(o_won))
+        )
+        _macro_values[key] = value
+    return value
+
+
+class UltimateState:
+    # Immutable position. x and o hold every small board, board b in bits 9b..9b+8.
+    # Each state keeps the one before it, so taking back the last move is free
+    __slots__ = ("x", "o", "x_won", "o_won", "closed", "active", "to_move", "winner", "last", "parent")
+
+    def __init__(self, x=0, o=0, x_won=0, o_won=0, closed=0, active=-1, to_move="X", winner=None,
+                 last=None, parent=None):
+        setattr_ = object.__setattr__
+        setattr_(self, "x", x)
+        setattr_(self, "o", o)
+        setattr_(self, "x_won", x_won)  # 9-bit masks of boards won by each side
+        setattr_(self, "o_won", o_won)
+        setattr_(self, "closed", closed)  # Boards won or full
+        setattr_(self, "active", active)  # Board the side to move must play in, or -1 for any
+        setattr_(self, "to_move", to_move)
+        setattr_(self, "winner", winner)
+        setattr_(self, "last", last)
+        setattr_(self, "parent", parent)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("UltimateState is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("UltimateState is immutable")
+
+    @property
+    def size(self):
+        return SIZE
+
+    def board(self, player, b):
+        return ((self.x if player == "X" else self.o) >> (9 * b)) & FULL
+
+    def legal_mask(self):
+        # Bits board * 9 + cell of every legal move
+        if self.winner is not None:
+            return 0
+        occupied = self.x | self.o
+        boards = (self.active,) if self.active >= 0 else OPEN_BOARDS[self.closed]
+        mask = 0
+        for b in boards:
+            mask |= (FULL & ~(occupied >> (9 * b))) << (9 * b)
+        return mask
+
+    def is_legal(self, move):
+        return bool(self.legal_mask() >> move & 1)
+
+    def apply(self, move, player=None):
+        if player is None:
+            player = self.to_move
+        if not self.is_legal(move):
+            raise ValueError(f"Move {move} is not legal here")
+        b, c = divmod(move, 9)
+        bit = 1 << move
+        x, o = (self.x | bit, self.o) if player == "X" else (self.x, self.o | bit)
+        x_won, o_won, closed = self.x_won, self.o_won, self.closed
+        mine = ((x if player == "X" else o) >> (9 * b)) & FULL
+        winner = None
+        if IS_WIN[mine]:
+            if player == "X":
+                x_won |= BIT[b]
+                winner = "X" if IS_WIN[x_won] else None
+            else:
+                o_won |= BIT[b]
+                winner = "O" if IS_WIN[o_won] else None
+            closed |= BIT[b]
+        elif ((x | o) >> (9 * b)) & FULL == FULL:
+            closed |= BIT[b]
+        active = -1 if closed & BIT[c] else c
+        return UltimateState(x, o, x_won, o_won, closed, active, "O" if player == "X" else "X", winner,
+                             move, self)
+
+    def without(self, move):
+        # Inverse of apply, for the last move only
+        if move != self.last:
+            raise ValueError("Only the last move can be taken back")
+        return self.parent
+
+    def with_turn(self, player):
+        if player == self.to_move:
+            return self
+        return UltimateState(self.x, self.o, self.x_won, self.o_won, self.closed, self.active, player,
+                             self.winner, self.last, self.parent)
+
+    def cell_index(self, row, col):
+        return (row // 3 * 3 + col // 3) * 9 + row % 3 * 3 + col % 3
+
+    def cell_coords(self, move):
+        b, c = divmod(move, 9)
+        return b // 3 * 3 + c // 3, b % 3 * 3 + c % 3
+
+    def get(self, row, col):
+        bit = 1 << self.cell_index(row, col)
+        if self.x & bit:
+            return "X"
+        if self.o & bit:
+            return "O"
+        return " "
+
+    def is_empty(self, row, col):
+        return not (self.x | self.o) >> self.cell_index(row, col) & 1
+
+    def is_full(self):
+        # Every board won or full without a macro line: a draw
+        return self.winner is None and self.closed == FULL
+
+    def is_over(self):
+        return self.winner is not None or self.closed == FULL
+
+    def board_owner(self, b):
+        if self.x_won & BIT[b]:
+            return "X"
+        if self.o_won & BIT[b]:
+            return "O"
+        return None
+
+    @property
+    def winning_cells(self):
+        # The line that won each small board on the winning macro line
+        if self.winner is None:
+            return []
+        won = self.x_won if self.winner == "X" else self.o_won
+        cells = []
+        for line in WIN_MASKS:
+            if won & line == line:
+                for b in iter_bits(line):
+                    mine = self.board(self.winner, b)
+                    small = next(mask for mask in WIN_MASKS if mine & mask == mask)
+                    cells += [self.cell_coords(9 * b + c) for c in iter_bits(small)]
+                return cells
+        return cells
+
+    def available_moves(self):
+        return [self.cell_coords(move) for move in iter_bits(self.legal_mask())]
+
+    def rows(self):
+        return [[self.get(r, c) for c in range(SIZE)] for r in range(SIZE)]
+
+
+class UltimateSearch:
+    # Iterative-deepening alpha-beta with make/unmake on per-board masks. Moves
+    # come from the precomputed tuples above, and the evaluation is kept up to
+    # date move by move, so the inner loop builds no lists or tuples
+    def __init__(self, time_budget_ms=1000, max_depth=81, stats=None, cancel_event=None):
+        self.time_budget_ms = time_budget_ms
+        self.max_depth = max_depth
+        self.stats = stats  # Optional SearchStats, updated in place
+        self.cancel_event = cancel_event  # Setting it ends the search like a timeout
+        self.table = {}
+        self.deadline = 0.0
+        self.nodes = 0
+
+    def search(self, state):
+        # Returns (score, move) for the side to move; move is board * 9 + cell
+        self.table = {}
+        self.nodes = 0
+        self.deadline = time.perf_counter() + self.time_budget_ms / 1000.0
+        moves = list(iter_bits(state.legal_mask()))
+        if not moves:
+            return 0, None
+        self.boards = [
+            [(state.x >> (9 * b)) & FULL for b in range(9)],
+            [(state.o >> (9 * b)) & FULL for b in range(9)],
+        ]
+        self.won = [state.x_won, state.o_won]
+        self.closed = state.closed
+        self.open_score = sum(
+            SUB_VALUES[self.boards[0][b] | self.boards[1][b] << 9] * WEIGHTS[b] for b in OPEN_BOARDS[state.closed]
+        )
+        self.macro_score = macro_value(state.x_won, state.o_won, state.closed)
+        self.hash = 0
+        for side, bits in enumerate((state.x, state.o)):
+            for move in iter_bits(bits):
+                self.hash ^= ZOBRIST[side][move]
+        side = 0 if state.to_move == "X" else 1
+        empty = 81 - bin(state.x | state.o).count("1")
+        best_score, best_move = 0, moves[0]
+        try:
+            for depth in range(1, min(self.max_depth, empty) + 1):
+                score = self._negamax(side, state.active, depth, 0, -WIN - 1, WIN + 1)
+                best_score, best_move = score, self.table[self._key(side, state.active)][3]
+                if abs(score) >= WIN // 2:
+                    break
+        except SearchTimeout:
+            pass
+        if self.stats is not None:
+            self.stats.nodes += self.nodes
+        return best_score, best_move
+
+    def _key(self, side, active):
+        return self.hash ^ ACTIVE_KEYS[active + 1] ^ (O_TO_MOVE if side else 0)
+
+    def _negamax(self, side, active, depth, ply, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 1023:
+            if time.perf_counter() > self.deadline or (self.cancel_event is not None and self.cancel_event.is_set()):
+                raise SearchTimeout()
+            if len(self.table) > TABLE_LIMIT:
+                self.table.clear()  # Long searches would otherwise grow it without bound
+        if depth == 0:
+            score = self.open_score + self.macro_score
+            return score if side == 0 else -score
+
+        alpha_orig, beta_orig = alpha, beta
+        key = self._key(side, active)
+        entry = self.table.get(key)
+        stats = self.stats
+        if stats is not None:
+            if ply > stats.max_depth:
+                stats.max_depth = ply
+            if entry is None:
+                stats.cache_misses += 1
+            else:
+                stats.cache_hits += 1
+        first = -1
+        if entry is not None:
+            entry_depth, score, flag, first = entry
+            if entry_depth >= depth:
+                score = _score_from_table(score, ply)
+                if flag == EXACT:
+                    return score
+                elif flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        boards = self.boards
+        mine = boards[side]
+        xs = boards[0]
+        os_ = boards[1]
+        won = self.won
+        zobrist = ZOBRIST[side]
+        other = 1 - side
+        best_score = -WIN - 1
+        best_move = -1
+        # The hash move goes first; every move tuple is prebuilt
+        for pass_ in (0, 1):
+            if pass_ == 0:
+                if first < 0:
+                    continue
+                candidates = SINGLE[first // 9]
+            else:
+                candidates = SINGLE[active] if active >= 0 else OPEN_BOARDS[self.closed]
+            for b in candidates:
+                m = mine[b]
+                x = xs[b]
+                o = os_[b]
+                bit_b = BIT[b]
+                old = SUB_VALUES[x | o << 9] * WEIGHTS[b]
+                for move in SINGLE[first] if pass_ == 0 else BOARD_MOVES[b][x | o]:
+                    if pass_ and move == first:
+                        continue
+                    c = move - 9 * b
+                    new = m | BIT[c]
+                    closed = self.closed
+                    won_before = won[side]
+                    open_score = self.open_score
+                    macro_score = self.macro_score
+                    if IS_WIN[new]:
+                        if IS_WIN[won_before | bit_b]:
+                            # Wins the game; nothing can score higher
+                            score = WIN - ply - 1
+                            self.table[key] = (depth, _score_to_table(score, ply), EXACT, move)
+                            return score
+                        won[side] = won_before | bit_b
+                        self.closed = closed | bit_b
+                        self.open_score = open_score - old
+                        self.macro_score = macro_value(won[0], won[1], self.closed)
+                    else:
+                        value = SUB_VALUES.get(new | o << 9 if side == 0 else x | new << 9)
+                        if value is None:
+                            # Full without a line
+                            self.closed = closed | bit_b
+                            self.open_score = open_score - old
+                            self.macro_score = macro_value(won[0], won[1], self.closed)
+                        else:
+                            self.open_score = open_score - old + value * WEIGHTS[b]
+                    if self.closed == FULL:
+                        score = 0  # Every board closed without a macro line
+                    else:
+                        mine[b] = new
+                        self.hash ^= zobrist[move]
+                        score = -self._negamax(other, -1 if self.closed >> c & 1 else c, depth - 1, ply + 1,
+                                               -beta, -alpha)
+                        self.hash ^= zobrist[move]
+                        mine[b] = m
+                    won[side] = won_before
+                    self.closed = closed
+                    self.open_score = open_score
+                    self.macro_score = macro_score
+                    if score > best_score:
+                        best_score = score
+                        best_move = move
+                        if score > alpha:
+                            alpha = score
+                            if alpha >= beta:
+                                break
+                if alpha >= beta:
+                    break
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (depth, _score_to_table(best_score, ply), flag, best_move)
+        return best_score